@@ -0,0 +1,44 @@
+"""add receipt filter indexes
+
+Revision ID: 3c1f7a9e5b20
+Revises: a76193de6afc
+Create Date: 2026-10-18 09:12:41.503117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f7a9e5b20'
+down_revision: Union[str, None] = 'a76193de6afc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# CREATE INDEX CONCURRENTLY cannot run inside a transaction block, so every
+# statement runs in an autocommit block and the tables stay writable.
+INDEXES = [
+    ('ix_receipts_owner_id_created_at_id', 'receipts', ['owner_id', 'created_at', 'id']),
+    (
+        'ix_receipts_owner_id_payment_type_created_at_id',
+        'receipts',
+        ['owner_id', 'payment_type', 'created_at', 'id'],
+    ),
+    ('ix_receipts_owner_id_total', 'receipts', ['owner_id', 'total']),
+    ('ix_receipt_items_receipt_id', 'receipt_items', ['receipt_id']),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,45 @@
+"""add receipt daily stats
+
+Revision ID: 7d2e4b8c1a63
+Revises: 3c1f7a9e5b20
+Create Date: 2026-10-18 11:40:07.218954
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2e4b8c1a63'
+down_revision: Union[str, None] = '3c1f7a9e5b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('receipt_daily_stats',
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('payment_type', postgresql.ENUM('CASH', 'CASHLESS', name='paymenttype', create_type=False), nullable=False),
+    sa.Column('receipts_count', sa.Integer(), nullable=False),
+    sa.Column('total', sa.DECIMAL(precision=14, scale=2), nullable=False),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('owner_id', 'day', 'payment_type')
+    )
+    # Backfill the rollup from the existing receipts.
+    op.execute(
+        """
+        INSERT INTO receipt_daily_stats (owner_id, day, payment_type, receipts_count, total)
+        SELECT owner_id, CAST(created_at AS DATE), payment_type, count(*), sum(total)
+        FROM receipts
+        WHERE owner_id IS NOT NULL AND created_at IS NOT NULL AND payment_type IS NOT NULL
+        GROUP BY owner_id, CAST(created_at AS DATE), payment_type
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('receipt_daily_stats')
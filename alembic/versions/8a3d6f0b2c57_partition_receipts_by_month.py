@@ -0,0 +1,178 @@
+"""partition receipts by month
+
+Revision ID: 8a3d6f0b2c57
+Revises: 5f8b2d1e9c46
+Create Date: 2026-10-18 20:04:51.318207
+
+"""
+from datetime import date, datetime
+from typing import List, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a3d6f0b2c57'
+down_revision: Union[str, None] = '5f8b2d1e9c46'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# A table cannot be turned into a partitioned one in place: the old tables are
+# renamed away, copied into partitioned tables and dropped. The copy holds
+# locks on both tables while it runs, so run it in a maintenance window.
+
+# Months after the current one that get their partitions right away.
+MONTHS_AHEAD = 3
+
+INDEXES = [
+    ('ix_receipts_id', 'receipts', ['id']),
+    ('ix_receipts_owner_id_created_at_id', 'receipts', ['owner_id', 'created_at', 'id']),
+    (
+        'ix_receipts_owner_id_payment_type_created_at_id',
+        'receipts',
+        ['owner_id', 'payment_type', 'created_at', 'id'],
+    ),
+    ('ix_receipts_owner_id_total', 'receipts', ['owner_id', 'total']),
+    ('ix_receipt_items_id', 'receipt_items', ['id']),
+    ('ix_receipt_items_receipt_id', 'receipt_items', ['receipt_id']),
+]
+
+RECEIPT_COLUMNS = 'id, total, rest, payment_type, payment_amount, created_at, owner_id'
+ITEM_COLUMNS = 'id, name, price, quantity, total, receipt_id'
+
+
+def month_start(day: date, months: int = 0) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_months() -> List[date]:
+    """Months from the first receipt to MONTHS_AHEAD months after the current one.
+
+    Older receipts go to the default partition when generating offline SQL.
+    """
+    today = datetime.utcnow().date()
+    first = None
+    if not op.get_context().as_sql:
+        first = op.get_bind().execute(
+            sa.text('SELECT min(created_at) FROM receipts_unpartitioned')
+        ).scalar()
+    month = month_start(min(first.date(), today) if first else today)
+    last = month_start(today, MONTHS_AHEAD)
+    months = []
+    while month <= last:
+        months.append(month)
+        month = month_start(month, 1)
+    return months
+
+
+def create_tables(partitioned: bool):
+    partition_by = {'postgresql_partition_by': 'RANGE (created_at)'} if partitioned else {}
+    op.create_table('receipts',
+    sa.Column('id', sa.Integer(), server_default=sa.text("nextval('receipts_id_seq')"), nullable=False),
+    sa.Column('total', sa.BigInteger(), nullable=True),
+    sa.Column('rest', sa.BigInteger(), nullable=True),
+    sa.Column('payment_type', postgresql.ENUM('CASH', 'CASHLESS', name='paymenttype', create_type=False), nullable=True),
+    sa.Column('payment_amount', sa.BigInteger(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=not partitioned),
+    sa.Column('owner_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id', 'created_at') if partitioned else sa.PrimaryKeyConstraint('id'),
+    **partition_by
+    )
+    item_columns = [
+        sa.Column('id', sa.Integer(), server_default=sa.text("nextval('receipt_items_id_seq')"), nullable=False),
+        sa.Column('name', sa.String(), nullable=True),
+        sa.Column('price', sa.BigInteger(), nullable=True),
+        sa.Column('quantity', sa.Integer(), nullable=True),
+        sa.Column('total', sa.BigInteger(), nullable=True),
+        sa.Column('receipt_id', sa.Integer(), nullable=True),
+    ]
+    if partitioned:
+        op.create_table('receipt_items',
+        *item_columns,
+        sa.Column('receipt_created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['receipt_id', 'receipt_created_at'], ['receipts.id', 'receipts.created_at'], ),
+        sa.PrimaryKeyConstraint('id', 'receipt_created_at'),
+        postgresql_partition_by='RANGE (receipt_created_at)'
+        )
+    else:
+        op.create_table('receipt_items',
+        *item_columns,
+        sa.ForeignKeyConstraint(['receipt_id'], ['receipts.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+
+def rename_tables(suffix: str):
+    """Move the current tables out of the way, keeping their ID sequences alive."""
+    for table in ('receipt_items', 'receipts'):
+        op.rename_table(table, f'{table}_{suffix}')
+        op.execute(f'ALTER TABLE {table}_{suffix} RENAME CONSTRAINT {table}_pkey TO {table}_{suffix}_pkey')
+        op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY NONE')
+
+
+def finish_tables(suffix: str):
+    """Drop the old tables and index the new ones once they hold the rows."""
+    op.drop_table(f'receipt_items_{suffix}')
+    op.drop_table(f'receipts_{suffix}')
+    for table in ('receipts', 'receipt_items'):
+        op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+    op.create_index(
+        'ix_receipt_items_name_trgm',
+        'receipt_items',
+        ['name'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'name': 'gin_trgm_ops'},
+    )
+    op.execute('ANALYZE receipts')
+    op.execute('ANALYZE receipt_items')
+
+
+def upgrade() -> None:
+    rename_tables('unpartitioned')
+    create_tables(partitioned=True)
+
+    op.execute('CREATE TABLE receipts_default PARTITION OF receipts DEFAULT')
+    op.execute('CREATE TABLE receipt_items_default PARTITION OF receipt_items DEFAULT')
+    for month in partition_months():
+        bounds = f"FROM ('{month}') TO ('{month_start(month, 1)}')"
+        for table in ('receipts', 'receipt_items'):
+            op.execute(
+                f'CREATE TABLE {table}_y{month:%Y}m{month:%m} '
+                f'PARTITION OF {table} FOR VALUES {bounds}'
+            )
+
+    # Receipts without a creation time are kept in the default partition.
+    op.execute(
+        f'INSERT INTO receipts ({RECEIPT_COLUMNS}) '
+        "SELECT id, total, rest, payment_type, payment_amount, "
+        "COALESCE(created_at, 'epoch'), owner_id FROM receipts_unpartitioned"
+    )
+    op.execute(
+        f'INSERT INTO receipt_items ({ITEM_COLUMNS}, receipt_created_at) '
+        "SELECT i.id, i.name, i.price, i.quantity, i.total, i.receipt_id, "
+        "COALESCE(r.created_at, 'epoch') FROM receipt_items_unpartitioned i "
+        'LEFT JOIN receipts_unpartitioned r ON r.id = i.receipt_id'
+    )
+    finish_tables('unpartitioned')
+
+
+def downgrade() -> None:
+    rename_tables('partitioned')
+    create_tables(partitioned=False)
+    op.execute(
+        f'INSERT INTO receipts ({RECEIPT_COLUMNS}) '
+        f'SELECT {RECEIPT_COLUMNS} FROM receipts_partitioned'
+    )
+    op.execute(
+        f'INSERT INTO receipt_items ({ITEM_COLUMNS}) '
+        f'SELECT {ITEM_COLUMNS} FROM receipt_items_partitioned'
+    )
+    finish_tables('partitioned')
@@ -0,0 +1,53 @@
+"""store money in minor units
+
+Revision ID: b58e0c3d9f14
+Revises: 7d2e4b8c1a63
+Create Date: 2026-10-18 14:02:55.871302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b58e0c3d9f14'
+down_revision: Union[str, None] = '7d2e4b8c1a63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Amount columns converted from DECIMAL hryvnias to BIGINT kopecks.
+MONEY_COLUMNS = {
+    'receipts': ['total', 'rest', 'payment_amount'],
+    'receipt_items': ['price', 'total'],
+    'receipt_daily_stats': ['total'],
+}
+
+DECIMAL_TYPES = {
+    'receipts': 'DECIMAL(10, 2)',
+    'receipt_items': 'DECIMAL(10, 2)',
+    'receipt_daily_stats': 'DECIMAL(14, 2)',
+}
+
+
+def upgrade() -> None:
+    # All columns of a table are changed by one ALTER TABLE so that every
+    # table is rewritten only once.
+    for table, columns in MONEY_COLUMNS.items():
+        changes = ', '.join(
+            f'ALTER COLUMN {column} TYPE BIGINT USING round({column} * 100)::bigint'
+            for column in columns
+        )
+        op.execute(f'ALTER TABLE {table} {changes}')
+
+
+def downgrade() -> None:
+    for table, columns in MONEY_COLUMNS.items():
+        decimal_type = DECIMAL_TYPES[table]
+        changes = ', '.join(
+            f'ALTER COLUMN {column} TYPE {decimal_type} USING ({column} / 100.0)::{decimal_type}'
+            for column in columns
+        )
+        op.execute(f'ALTER TABLE {table} {changes}')
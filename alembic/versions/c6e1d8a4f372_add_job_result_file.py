@@ -0,0 +1,26 @@
+"""add job result file
+
+Revision ID: c6e1d8a4f372
+Revises: 8a3d6f0b2c57
+Create Date: 2026-10-18 22:41:07.512840
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6e1d8a4f372'
+down_revision: Union[str, None] = '8a3d6f0b2c57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('jobs', sa.Column('result_file', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('jobs', 'result_file')
@@ -0,0 +1,42 @@
+"""add receipt item name search index
+
+Revision ID: e41a6c2f8d07
+Revises: b58e0c3d9f14
+Create Date: 2026-10-18 16:37:12.094518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e41a6c2f8d07'
+down_revision: Union[str, None] = 'b58e0c3d9f14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # Built concurrently so receipt_items stays writable while the index is built.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_receipt_items_name_trgm',
+            'receipt_items',
+            ['name'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={'name': 'gin_trgm_ops'},
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_receipt_items_name_trgm',
+            table_name='receipt_items',
+            postgresql_concurrently=True,
+        )
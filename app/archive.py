@@ -0,0 +1,409 @@
+import argparse
+import asyncio
+import json
+import mmap
+import os
+import struct
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import delete, func, tuple_
+from sqlalchemy.future import select
+from sqlalchemy.orm import selectinload
+from app import database
+from app.config import settings
+from app.enums.receipt_payment import PaymentType
+from app.models.receipt import Receipt as ReceiptModel
+from app.models.receipt_item import ReceiptItem
+from app.partitions import month_start
+
+# Receipts of past months are moved out of the database into one file per
+# month. A file holds blocks of up to BLOCK_SIZE receipts sorted by id, each
+# storing its receipts and items column by column, zlib-compressed; the first
+# receipt id of every block is indexed at the end of the file. A receipt is
+# read with a binary search over the memory-mapped index and the
+# decompression of one block. manifest.json lists the files and their ids.
+BLOCK_SIZE = 256
+MAGIC = b"RCPTARC1"
+MANIFEST = "manifest.json"
+
+# Receipts, items and name bytes of a block, padded so the columns stay aligned.
+BLOCK_HEADER = struct.Struct("<IIII")
+# Offset of the index and number of blocks, at the end of a file.
+TRAILER = struct.Struct("<QI4x8s")
+
+PAYMENT_TYPES = list(PaymentType)
+EPOCH = datetime(1970, 1, 1)
+
+
+def _micros(value: datetime) -> int:
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+def encode_block(receipts: List[ReceiptModel]) -> bytes:
+    """Lay out receipts sorted by id column by column and compress them.
+
+    Integer columns are written in native byte order: 8-byte columns first,
+    then 4-byte ones, then payment types and the UTF-8 item names.
+    """
+    items = [item for receipt in receipts for item in receipt.items]
+    names = [item.name.encode() for item in items]
+    columns = [
+        array("q", [receipt.id for receipt in receipts]),
+        array("q", [_micros(receipt.created_at) for receipt in receipts]),
+        array("q", [receipt.owner_id for receipt in receipts]),
+        array("q", [receipt.total for receipt in receipts]),
+        array("q", [receipt.rest for receipt in receipts]),
+        array("q", [receipt.payment_amount for receipt in receipts]),
+        array("q", [item.price for item in items]),
+        array("q", [item.quantity for item in items]),
+        array("q", [item.total for item in items]),
+        array("I", [len(receipt.items) for receipt in receipts]),
+        array("I", [len(name) for name in names]),
+        array("B", [PAYMENT_TYPES.index(receipt.payment_type) for receipt in receipts]),
+    ]
+    header = BLOCK_HEADER.pack(len(receipts), len(items), sum(map(len, names)), 0)
+    return zlib.compress(
+        b"".join([header, *(column.tobytes() for column in columns), *names])
+    )
+
+
+def decode_receipt(block: bytes, receipt_id: int) -> Optional[ReceiptModel]:
+    """Find a receipt in a decompressed block and rebuild it with its items."""
+    receipts, items, _, _ = BLOCK_HEADER.unpack_from(block)
+    view = memoryview(block)[BLOCK_HEADER.size :]
+
+    def column(code: str, length: int):
+        nonlocal view
+        size = length * array(code).itemsize
+        values, view = view[:size].cast(code), view[size:]
+        return values
+
+    ids = column("q", receipts)
+    index = bisect_left(ids, receipt_id)
+    if index == receipts or ids[index] != receipt_id:
+        return None
+
+    created_at, owner_ids, totals, rests, payment_amounts = (
+        column("q", receipts) for _ in range(5)
+    )
+    prices, quantities, item_totals = (column("q", items) for _ in range(3))
+    item_counts = column("I", receipts)
+    name_lengths = column("I", items)
+    payment_types = column("B", receipts)
+
+    first_item = sum(item_counts[:index])
+    last_item = first_item + item_counts[index]
+    name_start = sum(name_lengths[:first_item])
+    receipt_items = []
+    for position in range(first_item, last_item):
+        name_end = name_start + name_lengths[position]
+        receipt_items.append(
+            ReceiptItem(
+                name=bytes(view[name_start:name_end]).decode(),
+                price=prices[position],
+                quantity=quantities[position],
+                total=item_totals[position],
+                receipt_id=receipt_id,
+            )
+        )
+        name_start = name_end
+
+    return ReceiptModel(
+        id=receipt_id,
+        total=totals[index],
+        rest=rests[index],
+        payment_type=PAYMENT_TYPES[payment_types[index]],
+        payment_amount=payment_amounts[index],
+        created_at=EPOCH + timedelta(microseconds=created_at[index]),
+        owner_id=owner_ids[index],
+        items=receipt_items,
+    )
+
+
+class ArchiveWriter:
+    def __init__(self, path: str):
+        """
+        Writes an archive file block by block.
+        The file is written under a temporary name and moved in place on close.
+        Attributes:
+            path (str): Path of the archive file.
+        """
+        self.path = path
+        self.receipts = 0
+        self.items = 0
+        self.min_id = None
+        self.max_id = None
+        self._first_ids = array("q")
+        self._offsets = array("q")
+        self._file = open(f"{path}.tmp", "wb")
+        self._file.write(MAGIC)
+
+    def add_block(self, receipts: List[ReceiptModel]):
+        """Append a block of receipts, given in increasing id order."""
+        self._first_ids.append(receipts[0].id)
+        self._offsets.append(self._file.tell())
+        self._file.write(encode_block(receipts))
+        self.receipts += len(receipts)
+        self.items += sum(len(receipt.items) for receipt in receipts)
+        if self.min_id is None:
+            self.min_id = receipts[0].id
+        self.max_id = receipts[-1].id
+
+    def close(self):
+        index_offset = self._file.tell()
+        self._offsets.append(index_offset)
+        self._file.write(self._first_ids.tobytes())
+        self._file.write(self._offsets.tobytes())
+        self._file.write(TRAILER.pack(index_offset, len(self._first_ids), MAGIC))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(f"{self.path}.tmp", self.path)
+
+
+class ArchiveFile:
+    def __init__(self, path: str):
+        """
+        A memory-mapped archive file with its block index.
+        Attributes:
+            path (str): Path of the archive file.
+        """
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        index_offset, blocks, magic = TRAILER.unpack_from(
+            self._map, len(self._map) - TRAILER.size
+        )
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a receipt archive")
+        self._first_ids = array("q", self._map[index_offset : index_offset + 8 * blocks])
+        self._offsets = array(
+            "q", self._map[index_offset + 8 * blocks : index_offset + 16 * blocks + 8]
+        )
+
+    def get(self, receipt_id: int) -> Optional[ReceiptModel]:
+        block = bisect_right(self._first_ids, receipt_id) - 1
+        if block < 0:
+            return None
+        data = self._map[self._offsets[block] : self._offsets[block + 1]]
+        return decode_receipt(zlib.decompress(data), receipt_id)
+
+    def close(self):
+        self._map.close()
+
+
+def read_manifest(directory: str) -> Dict[str, dict]:
+    """Read the archived months of a directory, keyed by `YYYY-MM`."""
+    try:
+        with open(os.path.join(directory, MANIFEST)) as file:
+            return json.load(file)["months"]
+    except FileNotFoundError:
+        return {}
+
+
+def write_manifest(directory: str, months: Dict[str, dict]):
+    path = os.path.join(directory, MANIFEST)
+    with open(f"{path}.tmp", "w") as file:
+        json.dump({"months": months}, file, indent=2, sort_keys=True)
+    os.replace(f"{path}.tmp", path)
+
+
+class ArchiveReader:
+    def __init__(self, directory: str):
+        """
+        Reads archived receipts by id.
+        The manifest is reloaded when the archival command changes it, and
+        files are mapped on first use.
+        Attributes:
+            directory (str): Directory of the archive files and manifest.
+        """
+        self.directory = directory
+        self._version = None
+        self._ranges = []
+        self._files: Dict[str, ArchiveFile] = {}
+
+    def get(self, receipt_id: int) -> Optional[ReceiptModel]:
+        """Get an archived receipt with its items, or None if it is not archived."""
+        self._refresh()
+        for min_id, max_id, name in self._ranges:
+            if min_id <= receipt_id <= max_id:
+                archive_file = self._files.get(name)
+                if archive_file is None:
+                    archive_file = self._files[name] = ArchiveFile(
+                        os.path.join(self.directory, name)
+                    )
+                receipt = archive_file.get(receipt_id)
+                if receipt is not None:
+                    return receipt
+        return None
+
+    def _refresh(self):
+        try:
+            stat = os.stat(os.path.join(self.directory, MANIFEST))
+        except FileNotFoundError:
+            version = None
+        else:
+            version = (self.directory, stat.st_mtime_ns, stat.st_size)
+        if version == self._version:
+            return
+
+        for archive_file in self._files.values():
+            archive_file.close()
+        self._files = {}
+        self._ranges = sorted(
+            (entry["min_id"], entry["max_id"], entry["file"])
+            for entry in read_manifest(self.directory).values()
+        )
+        self._version = version
+
+
+archive_reader = ArchiveReader(settings.ARCHIVE_DIR)
+
+
+def _month_filter(month: date):
+    return (
+        ReceiptModel.created_at >= month,
+        ReceiptModel.created_at < month_start(month, 1),
+    )
+
+
+async def _write_month(session_factory, month: date, directory: str) -> Optional[dict]:
+    """Write the receipts of a month to its archive file, block by block."""
+    name = f"receipts-{month:%Y-%m}.arc"
+    writer = None
+    last_id = 0
+    async with session_factory() as db:
+        while True:
+            result = await db.execute(
+                select(ReceiptModel)
+                .filter(*_month_filter(month), ReceiptModel.id > last_id)
+                .options(selectinload(ReceiptModel.items))
+                .order_by(ReceiptModel.id)
+                .limit(BLOCK_SIZE)
+            )
+            receipts = result.scalars().all()
+            if not receipts:
+                break
+            if writer is None:
+                writer = ArchiveWriter(os.path.join(directory, name))
+            writer.add_block(receipts)
+            last_id = receipts[-1].id
+            db.expunge_all()
+
+    if writer is None:
+        return None
+    writer.close()
+    return {
+        "file": name,
+        "min_id": writer.min_id,
+        "max_id": writer.max_id,
+        "receipts": writer.receipts,
+        "items": writer.items,
+    }
+
+
+async def _delete_month(session_factory, month: date, entry: dict, batch_size: int) -> int:
+    """Delete the archived receipts of a month and their items, one transaction per batch.
+
+    Only the receipts in the ID range of the archive file are deleted; a
+    receipt of the month that was not written to it is kept.
+    """
+    deleted = 0
+    while True:
+        async with session_factory() as db:
+            result = await db.execute(
+                select(ReceiptModel.id, ReceiptModel.created_at)
+                .filter(
+                    *_month_filter(month),
+                    ReceiptModel.id >= entry["min_id"],
+                    ReceiptModel.id <= entry["max_id"],
+                )
+                .order_by(ReceiptModel.id)
+                .limit(batch_size)
+            )
+            keys = [tuple(row) for row in result]
+            if not keys:
+                return deleted
+            await db.execute(
+                delete(ReceiptItem).where(
+                    tuple_(ReceiptItem.receipt_id, ReceiptItem.receipt_created_at).in_(keys)
+                )
+            )
+            await db.execute(
+                delete(ReceiptModel).where(
+                    tuple_(ReceiptModel.id, ReceiptModel.created_at).in_(keys)
+                )
+            )
+            await db.commit()
+            deleted += len(keys)
+
+
+def _check_cutoff(before: date):
+    if month_start(before) > month_start(datetime.utcnow().date()):
+        raise ValueError(
+            f"Cannot archive receipts before {before}: the current month has not ended"
+        )
+
+
+async def archive_receipts(
+    session_factory,
+    before: date,
+    directory: str = settings.ARCHIVE_DIR,
+    batch_size: int = settings.ARCHIVE_BATCH_SIZE,
+) -> Dict[str, dict]:
+    """Move the receipts of the months before the month of `before` to the archive.
+
+    A month is written to its file and listed in the manifest before any of
+    its rows are deleted, so an interrupted run is completed by running it
+    again. Only months that have ended can be archived: a cutoff after the
+    start of the current month raises ValueError. Returns the manifest
+    entries of the months archived by this run.
+    """
+    _check_cutoff(before)
+    os.makedirs(directory, exist_ok=True)
+    async with session_factory() as db:
+        first = await db.scalar(select(func.min(ReceiptModel.created_at)))
+    if first is None:
+        return {}
+
+    months = read_manifest(directory)
+    archived = {}
+    month = month_start(first.date())
+    while month < month_start(before):
+        key = f"{month:%Y-%m}"
+        if key not in months:
+            entry = await _write_month(session_factory, month, directory)
+            if entry is not None:
+                months[key] = archived[key] = entry
+                write_manifest(directory, months)
+        if key in months:
+            await _delete_month(session_factory, month, months[key], batch_size)
+        month = month_start(month, 1)
+    return archived
+
+
+async def _main(before: date):
+    try:
+        archived = await archive_receipts(database.get_session_factory(), before)
+    finally:
+        await database.dispose_engines()
+    for key, entry in archived.items():
+        print(f"{key}: {entry['receipts']} receipts, {entry['items']} items")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move old receipts to the archive.")
+    parser.add_argument(
+        "--before",
+        type=date.fromisoformat,
+        default=month_start(datetime.utcnow().date(), -settings.ARCHIVE_AFTER_MONTHS),
+        help="archive the months before the month of this date",
+    )
+    args = parser.parse_args()
+    try:
+        _check_cutoff(args.before)
+    except ValueError as ex:
+        parser.error(str(ex))
+    asyncio.run(_main(args.before))
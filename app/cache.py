@@ -0,0 +1,189 @@
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class CacheBackend(ABC):
+    def __init__(self, name: str, ttl: Optional[float] = None):
+        """
+        Base class for key-value caches with hit/miss counters.
+        Attributes:
+            name (str): Cache name used in stats and shared keys.
+            ttl (float): Default time to live of an entry in seconds.
+        """
+        self.name = name
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @abstractmethod
+    async def get(self, key: tuple) -> Optional[Any]:
+        """Get a value or None if it is missing or expired."""
+
+    @abstractmethod
+    async def set(self, key: tuple, value: Any, ttl: Optional[float] = None):
+        """Store a value, optionally with its own time to live."""
+
+    @abstractmethod
+    async def add(self, key: tuple, value: Any, ttl: Optional[float] = None) -> bool:
+        """Store a value only if the key is missing; return whether it was stored."""
+
+    @abstractmethod
+    async def delete(self, key: tuple):
+        """Delete a single entry."""
+
+    @abstractmethod
+    async def delete_prefix(self, prefix: tuple):
+        """Delete every entry whose key starts with the given prefix."""
+
+    @abstractmethod
+    async def clear(self):
+        """Delete every entry."""
+
+    def stats(self) -> dict:
+        """Return the cache counters."""
+        return {"hits": self.hits, "misses": self.misses}
+
+    def _record(self, value: Optional[Any]) -> Optional[Any]:
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+
+class MemoryCache(CacheBackend):
+    def __init__(self, name: str, maxsize: int, ttl: Optional[float] = None):
+        """
+        In-process LRU cache with per-entry expiry.
+        Attributes:
+            maxsize (int): Maximum number of entries kept.
+        """
+        super().__init__(name, ttl)
+        self.maxsize = maxsize
+        self.evictions = 0
+        self._entries: OrderedDict = OrderedDict()
+
+    async def get(self, key: tuple) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return self._record(None)
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            return self._record(None)
+        self._entries.move_to_end(key)
+        return self._record(value)
+
+    async def set(self, key: tuple, value: Any, ttl: Optional[float] = None):
+        if self.maxsize <= 0:
+            return
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def add(self, key: tuple, value: Any, ttl: Optional[float] = None) -> bool:
+        entry = self._entries.get(key)
+        if entry is not None and (entry[0] is None or entry[0] > time.monotonic()):
+            return False
+        await self.set(key, value, ttl)
+        return True
+
+    async def delete(self, key: tuple):
+        self._entries.pop(key, None)
+
+    async def delete_prefix(self, prefix: tuple):
+        for key in [key for key in self._entries if key[: len(prefix)] == prefix]:
+            del self._entries[key]
+
+    async def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            **super().stats(),
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "evictions": self.evictions,
+        }
+
+
+class RedisCache(CacheBackend):
+    def __init__(self, name: str, url: str, ttl: Optional[float] = None):
+        """
+        Cache shared between workers, stored in Redis as JSON.
+        Attributes:
+            url (str): Redis connection URL.
+        """
+        super().__init__(name, ttl)
+        try:
+            from redis import asyncio as redis
+        except ImportError:
+            raise RuntimeError("The redis package is required for a shared cache")
+        self._redis = redis.from_url(url)
+
+    def _key(self, key: tuple) -> str:
+        return ":".join(map(str, (self.name, *key)))
+
+    async def get(self, key: tuple) -> Optional[Any]:
+        value = await self._redis.get(self._key(key))
+        return self._record(json.loads(value) if value is not None else None)
+
+    async def set(self, key: tuple, value: Any, ttl: Optional[float] = None):
+        ttl = ttl if ttl is not None else self.ttl
+        await self._redis.set(
+            self._key(key), json.dumps(value), px=int(ttl * 1000) if ttl else None
+        )
+
+    async def add(self, key: tuple, value: Any, ttl: Optional[float] = None) -> bool:
+        ttl = ttl if ttl is not None else self.ttl
+        return bool(
+            await self._redis.set(
+                self._key(key),
+                json.dumps(value),
+                px=int(ttl * 1000) if ttl else None,
+                nx=True,
+            )
+        )
+
+    async def delete(self, key: tuple):
+        await self._redis.delete(self._key(key))
+
+    async def delete_prefix(self, prefix: tuple):
+        await self.delete(prefix)
+        async for key in self._redis.scan_iter(match=f"{self._key(prefix)}:*"):
+            await self._redis.delete(key)
+
+    async def clear(self):
+        async for key in self._redis.scan_iter(match=f"{self.name}:*"):
+            await self._redis.delete(key)
+
+
+caches: Dict[str, CacheBackend] = {}
+
+
+def create_cache(
+    name: str, maxsize: int, ttl: Optional[float] = None, url: Optional[str] = None
+) -> CacheBackend:
+    """
+    Create a named cache and register it for stats and invalidation.
+    Args:
+        name (str): Cache name.
+        maxsize (int): Maximum number of entries of an in-process cache.
+        ttl (float): Default time to live of an entry in seconds.
+        url (str): Redis URL of a shared cache; an in-process cache is used if empty.
+    Returns:
+        The cache backend.
+    """
+    if url:
+        cache = RedisCache(name, url, ttl)
+    else:
+        cache = MemoryCache(name, maxsize, ttl)
+    caches[name] = cache
+    return cache
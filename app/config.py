@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic_core import MultiHostUrl
 from pydantic import (
@@ -67,9 +68,87 @@ class Settings(BaseSettings):
             path=self.POSTGRES_DB,
         )
 
+    # Connection pool of the async engine, per worker process.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_PRE_PING: bool = False
+    DB_POOL_RECYCLE: int = -1
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # Pool connections opened, with the hot statements prepared, on startup.
+    DB_WARMUP_CONNECTIONS: int = 2
+    # asyncpg URL of a read replica; read-only routes use the primary if empty.
+    DB_REPLICA_URL: Optional[str] = None
+    # Seconds a client keeps reading from the primary after a write.
+    DB_READ_PRIMARY_AFTER_WRITE: int = 5
+    # Months ahead of the current one that get their receipt partitions on
+    # startup and on POST /internal/partitions.
+    PARTITION_MONTHS_AHEAD: int = 3
+    # `python -m app.archive` moves receipts older than ARCHIVE_AFTER_MONTHS
+    # months to files in ARCHIVE_DIR, deleting ARCHIVE_BATCH_SIZE rows at a time.
+    ARCHIVE_DIR: str = "archive"
+    ARCHIVE_AFTER_MONTHS: int = 36
+    ARCHIVE_BATCH_SIZE: int = 1000
+
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
     ALGORITHM: str = "HS256"
 
+    # bcrypt runs in a thread pool of this size; calls beyond the pending
+    # limit are rejected with 503 instead of queueing without bound.
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+
+    # Redis URL of the shared cache backend; in-process caches are used if empty.
+    CACHE_URL: Optional[str] = None
+    RECEIPT_TEXT_CACHE_SIZE: int = 10000
+    RECEIPT_TEXT_CACHE_TTL: int = 3600
+    AUTH_CACHE_SIZE: int = 10000
+    AUTH_CACHE_TTL: int = 300
+
+    # Receipts never change, so their responses may be cached for this long.
+    RECEIPT_MAX_AGE: int = 31536000
+
+    # Required in the X-Internal-Token header of /internal endpoints, which are
+    # closed while it is not set.
+    INTERNAL_API_TOKEN: Optional[str] = None
+
+    # Responses of create requests sent with an Idempotency-Key are replayed to
+    # retries for IDEMPOTENCY_TTL seconds. A running request renews the lock on
+    # its key every IDEMPOTENCY_LOCK_TTL / 2 seconds; duplicates wait for it for
+    # up to IDEMPOTENCY_LOCK_TTL seconds.
+    IDEMPOTENCY_CACHE_SIZE: int = 100000
+    IDEMPOTENCY_TTL: int = 86400
+    IDEMPOTENCY_LOCK_TTL: int = 30
+
+    # Celery broker URL of the job workers; jobs run in the API process if empty,
+    # at most JOB_CONCURRENCY at a time (inline when JOB_EAGER is set).
+    JOB_BROKER_URL: Optional[str] = None
+    JOB_CONCURRENCY: int = 2
+    JOB_EAGER: bool = False
+    # A job still running JOB_VISIBILITY_TIMEOUT seconds after it started is
+    # taken as lost with its worker and may be claimed and run again.
+    JOB_VISIBILITY_TIMEOUT: int = 3600
+
+    # Job results are written to files in JOB_RESULT_DIR, which the API and the
+    # job workers have to share; a result larger than JOB_RESULT_MAX_BYTES
+    # fails its job.
+    JOB_RESULT_DIR: str = "job_results"
+    JOB_RESULT_MAX_BYTES: int = 512 * 1024 * 1024
+
+    # Requests sent with the internal token in the X-Profile header are
+    # profiled; the middleware is not installed otherwise. Enabling it
+    # requires INTERNAL_API_TOKEN.
+    PROFILING_ENABLED: bool = False
+    PROFILE_SAMPLE_INTERVAL: float = 0.005
+    PROFILE_STORE_SIZE: int = 100
+    PROFILE_TTL: int = 3600
+
+    @model_validator(mode="after")
+    def _require_profiling_token(self):
+        if self.PROFILING_ENABLED and not self.INTERNAL_API_TOKEN:
+            raise ValueError("PROFILING_ENABLED requires INTERNAL_API_TOKEN to be set")
+        return self
+
 
 settings = Settings()
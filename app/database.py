@@ -1,31 +1,137 @@
-from typing import AsyncGenerator
-from fastapi import HTTPException
+import asyncio
+import logging
+from contextlib import AsyncExitStack
+from typing import AsyncGenerator, Optional, Sequence
+from fastapi import Depends, HTTPException, Request, Response
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy import Engine, Executable, create_engine
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
+from app.db_pool import InstrumentedQueuePool
+from app.metrics import instrument_engine
 from sqlalchemy.ext.declarative import declarative_base
 
 
-engine = create_async_engine(
-    str(settings.SQLALCHEMY_DATABASE_URL), future=True, echo=False
-)
+_engine: Optional[AsyncEngine] = None
+_replica_engine: Optional[AsyncEngine] = None
+_sync_engine: Optional[Engine] = None
+_async_session: Optional[sessionmaker] = None
+_read_session: Optional[sessionmaker] = None
+_primary_read_session: Optional[sessionmaker] = None
+_sync_session: Optional[sessionmaker] = None
 
-sync_engine = create_engine(
-    str(settings.SYNC_SQLALCHEMY_DATABASE_URL), future=True, echo=False
-)
+# Set after a write so the client's next reads go to the primary, not a lagging replica.
+READ_PRIMARY_COOKIE = "read_primary"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
 
-async_session = sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+logger = logging.getLogger(__name__)
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    engine = create_async_engine(
+        url,
+        future=True,
+        echo=False,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        connect_args={
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE
+        },
+    )
+    instrument_engine(engine.sync_engine)
+    return engine
+
+
+def get_engine() -> AsyncEngine:
+    """Create the async engine of the primary database on first use."""
+    global _engine
+    if _engine is None:
+        _engine = _create_engine(str(settings.SQLALCHEMY_DATABASE_URL))
+    return _engine
+
+
+def get_replica_engine() -> AsyncEngine:
+    """Create the async engine of the read replica on first use.
+
+    Without `DB_REPLICA_URL` reads go to the primary.
+    """
+    global _replica_engine
+    if not settings.DB_REPLICA_URL:
+        return get_engine()
+    if _replica_engine is None:
+        _replica_engine = _create_engine(settings.DB_REPLICA_URL)
+    return _replica_engine
+
+
+def get_sync_engine() -> Engine:
+    """Create the synchronous engine on first use."""
+    global _sync_engine
+    if _sync_engine is None:
+        _sync_engine = create_engine(
+            str(settings.SYNC_SQLALCHEMY_DATABASE_URL), future=True, echo=False
+        )
+        instrument_engine(_sync_engine)
+    return _sync_engine
+
+
+async def warm_up(
+    engine: AsyncEngine, connections: int, statements: Sequence[Executable] = ()
+):
+    """Open pool connections ahead of the first requests.
+
+    Every connection runs the given statements once, so asyncpg has them
+    prepared before real traffic arrives. Failures are logged, not raised,
+    so an unavailable database does not prevent the app from starting.
+    """
+    if connections <= 0:
+        return
+    try:
+        async with AsyncExitStack() as stack:
+            opened = await asyncio.gather(
+                *(stack.enter_async_context(engine.connect()) for _ in range(connections))
+            )
+            for connection in opened:
+                for statement in statements:
+                    await connection.execute(statement)
+                await connection.rollback()
+    except (SQLAlchemyError, OSError) as ex:
+        logger.warning("Database warm-up failed: %s", ex)
+
+
+async def dispose_engines():
+    """Close every pooled connection and forget the engines."""
+    global _engine, _replica_engine, _sync_engine
+    global _async_session, _read_session, _primary_read_session, _sync_session
+    if _engine is not None:
+        await _engine.dispose()
+    if _replica_engine is not None:
+        await _replica_engine.dispose()
+    if _sync_engine is not None:
+        _sync_engine.dispose()
+    _engine = _replica_engine = _sync_engine = None
+    _async_session = _read_session = _primary_read_session = _sync_session = None
 
-sync_session = sessionmaker(sync_engine, expire_on_commit=False)
 
 Base = declarative_base()
 
 
 # Dependency
-async def get_db() -> AsyncGenerator:
-    async with async_session() as session:
+async def get_db(request: Request, response: Response) -> AsyncGenerator:
+    if settings.DB_REPLICA_URL and request.method not in SAFE_METHODS:
+        # The response is built before this dependency exits, so the cookie
+        # is set up front for every request that may write.
+        response.set_cookie(
+            READ_PRIMARY_COOKIE,
+            "1",
+            max_age=settings.DB_READ_PRIMARY_AFTER_WRITE,
+            httponly=True,
+        )
+    async with get_session_factory()() as session:
         try:
             yield session
             await session.commit()
@@ -39,8 +145,56 @@ async def get_db() -> AsyncGenerator:
             await session.close()
 
 
+def get_session_factory():
+    """Provide the session factory to handlers that outlive the request scope.
+
+    Streaming responses are sent after the dependencies have been closed, so
+    they open and close their own session with this factory.
+    """
+    global _async_session
+    if _async_session is None:
+        _async_session = sessionmaker(
+            get_engine(), expire_on_commit=False, class_=AsyncSession
+        )
+    return _async_session
+
+
+def _read_only_sessionmaker(engine: AsyncEngine) -> sessionmaker:
+    return sessionmaker(
+        engine.execution_options(postgresql_readonly=True),
+        expire_on_commit=False,
+        class_=AsyncSession,
+    )
+
+
+def get_read_session_factory(request: Request):
+    """Provide the factory of read-only sessions for the request.
+
+    Sessions use the replica, or the primary if the client wrote within the
+    last `DB_READ_PRIMARY_AFTER_WRITE` seconds, so it reads its own writes.
+    Their transactions run as `READ ONLY`.
+    """
+    global _read_session, _primary_read_session
+    if request.cookies.get(READ_PRIMARY_COOKIE):
+        if _primary_read_session is None:
+            _primary_read_session = _read_only_sessionmaker(get_engine())
+        return _primary_read_session
+    if _read_session is None:
+        _read_session = _read_only_sessionmaker(get_replica_engine())
+    return _read_session
+
+
+async def get_read_db(session_factory=Depends(get_read_session_factory)) -> AsyncGenerator:
+    """Provide a read-only session; it is closed without a commit."""
+    async with session_factory() as session:
+        yield session
+
+
 def get_sync_db():
-    session = sync_session()
+    global _sync_session
+    if _sync_session is None:
+        _sync_session = sessionmaker(get_sync_engine(), expire_on_commit=False)
+    session = _sync_session()
     try:
         yield session
         session.commit()
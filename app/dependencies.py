@@ -1,15 +1,24 @@
-from fastapi import Depends, HTTPException, status
+import hashlib
+import hmac
+import time
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from app.database import get_db
 from app.utils import decode_access_token
 from app.models.user import User
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
+from app.config import settings
 from app.services.user_service import UserService
+from app.cache import create_cache
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/token")
 
+token_cache = create_cache(
+    "auth_tokens", settings.AUTH_CACHE_SIZE, settings.AUTH_CACHE_TTL, settings.CACHE_URL
+)
+
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
@@ -18,13 +27,39 @@ async def get_current_user(
 
     This function decodes the access token to retrieve the user ID,
     then fetches the user from the database using the user ID.
+    Decoded tokens and users are cached, so in steady state an
+    authenticated request does not query the users table.
     """
-    payload = decode_access_token(token)
-    id: str = payload.get("sub")
-    if not id:
-        raise HTTPException(status_code=401, detail="Invalid authentication token")
+    token_key = (hashlib.sha256(token.encode()).hexdigest(),)
+    user_id = await token_cache.get(token_key)
+    if user_id is None:
+        payload = decode_access_token(token)
+        id: str = payload.get("sub")
+        if not id:
+            raise HTTPException(status_code=401, detail="Invalid authentication token")
+
+        user_id = int(id)
+        ttl = settings.AUTH_CACHE_TTL
+        if "exp" in payload:
+            ttl = min(ttl, payload["exp"] - time.time())
+        await token_cache.set(token_key, user_id, ttl)
 
     user_service = UserService(db)
 
-    user = await user_service.get(int(id))
+    user = await user_service.get_cached(user_id)
     return user
+
+
+async def verify_internal_token(x_internal_token: Optional[str] = Header(None)):
+    """Restrict internal endpoints to callers that know `INTERNAL_API_TOKEN`.
+
+    The endpoints are closed to everyone while no token is configured.
+    """
+    if (
+        not settings.INTERNAL_API_TOKEN
+        or x_internal_token is None
+        or not hmac.compare_digest(
+            x_internal_token.encode(), settings.INTERNAL_API_TOKEN.encode()
+        )
+    ):
+        raise HTTPException(status_code=403, detail="Access forbidden")
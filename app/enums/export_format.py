@@ -0,0 +1,10 @@
+from enum import Enum
+
+class ExportFormat(Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+class TextBatchFormat(Enum):
+    TEXT = "text"
+    ZIP = "zip"
@@ -0,0 +1,6 @@
+from enum import Enum
+
+class JobKind(Enum):
+    EXPORT = "export"
+    REPRINT = "reprint"
+    REBUILD_STATS = "rebuild_stats"
@@ -0,0 +1,6 @@
+from enum import Enum
+
+class SearchMode(Enum):
+    PREFIX = "prefix"
+    CONTAINS = "contains"
+    FUZZY = "fuzzy"
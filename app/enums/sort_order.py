@@ -0,0 +1,5 @@
+from enum import Enum
+
+class SortOrder(Enum):
+    ASC = "asc"
+    DESC = "desc"
@@ -0,0 +1,141 @@
+import asyncio
+import hashlib
+import hmac
+import time
+from typing import Any, Awaitable, Callable, Dict, Type
+from fastapi import HTTPException, Response
+from pydantic import BaseModel
+from app.cache import create_cache
+from app.config import settings
+
+# Seconds between checks of a duplicate running in another worker.
+POLL_INTERVAL = 0.05
+
+idempotency_cache = create_cache(
+    "idempotency",
+    settings.IDEMPOTENCY_CACHE_SIZE,
+    settings.IDEMPOTENCY_TTL,
+    settings.CACHE_URL,
+)
+
+_in_flight: Dict[tuple, asyncio.Event] = {}
+
+
+async def idempotent(
+    key: tuple,
+    request: BaseModel,
+    response_model: Type[BaseModel],
+    handler: Callable[[], Awaitable[Any]],
+    response: Response,
+) -> Response:
+    """Run a create handler once per idempotency key and replay its response.
+
+    The first request claims the key and stores its response; retries get
+    the stored response without running the handler, and duplicates that
+    arrive while it runs wait for it. The lock on the key is renewed while
+    the handler runs, so a slow handler is never run twice. A failed request
+    releases the key so it can be retried. Reusing a key for a different
+    request body is a 422.
+
+    FastAPI drops the headers dependencies set on the injected `response`
+    when an endpoint returns a response of its own, so they are copied to
+    the returned one, e.g. the cookie sending reads to the primary.
+    """
+    result = await _replay_or_run(key, request, response_model, handler)
+    result.headers.raw.extend(response.headers.raw)
+    return result
+
+
+async def _replay_or_run(
+    key: tuple,
+    request: BaseModel,
+    response_model: Type[BaseModel],
+    handler: Callable[[], Awaitable[Any]],
+) -> Response:
+    # Keyed, so that stored fingerprints do not reveal the request bodies,
+    # passwords included.
+    fingerprint = hmac.new(
+        settings.SECRET_KEY.encode(),
+        request.model_dump_json().encode(),
+        hashlib.sha256,
+    ).hexdigest()
+    deadline = time.monotonic() + settings.IDEMPOTENCY_LOCK_TTL
+    while True:
+        # A request running in this worker holds its key even if its lock
+        # was lost, so duplicates wait for it instead of claiming the key.
+        if key not in _in_flight and await idempotency_cache.add(
+            key, {"fingerprint": fingerprint}, settings.IDEMPOTENCY_LOCK_TTL
+        ):
+            return await _run(key, fingerprint, response_model, handler)
+
+        entry = await idempotency_cache.get(key)
+        if entry is not None:
+            if entry["fingerprint"] != fingerprint:
+                raise HTTPException(
+                    status_code=422,
+                    detail="Idempotency-Key was already used for a different request",
+                )
+            if "body" in entry:
+                return Response(
+                    content=entry["body"],
+                    media_type="application/json",
+                    headers={"Idempotent-Replayed": "true"},
+                )
+        elif key not in _in_flight:
+            continue
+        if time.monotonic() >= deadline:
+            raise HTTPException(
+                status_code=409,
+                detail="A request with this Idempotency-Key is in progress",
+            )
+        await _wait(key, deadline)
+
+
+async def _run(
+    key: tuple,
+    fingerprint: str,
+    response_model: Type[BaseModel],
+    handler: Callable[[], Awaitable[Any]],
+) -> Response:
+    done = _in_flight[key] = asyncio.Event()
+    renewal = asyncio.create_task(_renew_lock(key, fingerprint))
+    try:
+        body = response_model.model_validate(await handler()).model_dump_json()
+    except BaseException:
+        await _stop_renewing(renewal)
+        await idempotency_cache.delete(key)
+        raise
+    else:
+        await _stop_renewing(renewal)
+        await idempotency_cache.set(key, {"fingerprint": fingerprint, "body": body})
+    finally:
+        if _in_flight.get(key) is done:
+            del _in_flight[key]
+        done.set()
+    return Response(content=body, media_type="application/json")
+
+
+async def _renew_lock(key: tuple, fingerprint: str):
+    """Renew the lock on a key while its handler runs longer than the lock TTL."""
+    while True:
+        await asyncio.sleep(settings.IDEMPOTENCY_LOCK_TTL / 2)
+        await idempotency_cache.set(
+            key, {"fingerprint": fingerprint}, settings.IDEMPOTENCY_LOCK_TTL
+        )
+
+
+async def _stop_renewing(renewal: asyncio.Task):
+    renewal.cancel()
+    await asyncio.gather(renewal, return_exceptions=True)
+
+
+async def _wait(key: tuple, deadline: float):
+    """Wait for the request holding a key, in this worker or another one."""
+    done = _in_flight.get(key)
+    if done is None:
+        await asyncio.sleep(POLL_INTERVAL)
+        return
+    try:
+        await asyncio.wait_for(done.wait(), max(deadline - time.monotonic(), 0))
+    except asyncio.TimeoutError:
+        pass
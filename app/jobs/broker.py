@@ -0,0 +1,123 @@
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Optional
+from app.config import settings
+from app.jobs.runner import get_runnable_job_ids, run_job
+
+
+class JobBroker(ABC):
+    """Runs stored jobs outside of the request that submitted them."""
+
+    @abstractmethod
+    async def submit(self, job_id: str):
+        """Schedule a stored pending job."""
+
+    async def resubmit(self) -> int:
+        """Submit the pending and lost jobs again on startup.
+
+        Brokers keeping their queue across restarts, like Celery, which also
+        redelivers the jobs of lost workers, resubmit nothing: every API
+        process would deliver each job again. Returns the number of
+        resubmitted jobs.
+        """
+        return 0
+
+    async def close(self):
+        """Stop the broker on shutdown."""
+
+    def stats(self) -> dict:
+        """Return the broker counters."""
+        return {"broker": type(self).__name__}
+
+
+class InProcessBroker(JobBroker):
+    def __init__(self, concurrency: int, eager: bool = False):
+        """
+        Runs jobs as tasks of the API process's event loop.
+        Attributes:
+            concurrency (int): Maximum number of jobs running at once; the
+                rest wait for a slot.
+            eager (bool): Run jobs inline when they are submitted, for tests.
+        """
+        self.concurrency = concurrency
+        self.eager = eager
+        self._slots = asyncio.Semaphore(concurrency)
+        self._tasks = set()
+        self._running = 0
+
+    async def submit(self, job_id: str):
+        if self.eager:
+            await run_job(job_id)
+            return
+        task = asyncio.create_task(self._run(job_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, job_id: str):
+        async with self._slots:
+            self._running += 1
+            try:
+                await run_job(job_id)
+            finally:
+                self._running -= 1
+
+    async def resubmit(self) -> int:
+        """Run the pending and lost jobs again.
+
+        Jobs queued in a stopped process are otherwise never run. Every API
+        process resubmits them, but a job is claimed by one of them only.
+        """
+        job_ids = await get_runnable_job_ids()
+        for job_id in job_ids:
+            await self.submit(job_id)
+        return len(job_ids)
+
+    async def join(self):
+        """Wait until every submitted job has finished."""
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def close(self):
+        await self.join()
+
+    def stats(self) -> dict:
+        return {
+            **super().stats(),
+            "concurrency": self.concurrency,
+            "running": self._running,
+            "queued": len(self._tasks) - self._running,
+        }
+
+
+class CeleryBroker(JobBroker):
+    def __init__(self):
+        """
+        Sends jobs to Celery workers started with
+        `celery -A app.jobs.celery_app worker --concurrency=N`.
+        """
+        from app.jobs.celery_app import run_job_task
+
+        self._task = run_job_task
+
+    async def submit(self, job_id: str):
+        await asyncio.to_thread(self._task.delay, job_id)
+
+
+def create_broker(
+    url: Optional[str] = None, concurrency: int = 1, eager: bool = False
+) -> JobBroker:
+    """
+    Create the job broker.
+    Args:
+        url (str): Celery broker URL; jobs run in-process if empty.
+        concurrency (int): Maximum number of jobs run at once in-process.
+        eager (bool): Run in-process jobs inline when they are submitted.
+    Returns:
+        The job broker.
+    """
+    if url:
+        return CeleryBroker()
+    return InProcessBroker(concurrency, eager)
+
+
+broker = create_broker(settings.JOB_BROKER_URL, settings.JOB_CONCURRENCY, settings.JOB_EAGER)
@@ -0,0 +1,27 @@
+import asyncio
+from celery import Celery
+import app.models  # noqa: F401 - registers every mapper in the worker
+from app import database
+from app.config import settings
+from app.jobs.runner import run_job
+
+celery_app = Celery("receipt_api", broker=settings.JOB_BROKER_URL)
+# A job is acknowledged once it has run, and a worker takes one job at a
+# time, so jobs of a lost worker are redelivered instead of dropped. A
+# redelivered job that its lost worker left running is only claimed again
+# after JOB_VISIBILITY_TIMEOUT.
+celery_app.conf.update(task_acks_late=True, worker_prefetch_multiplier=1)
+
+
+@celery_app.task(name="jobs.run")
+def run_job_task(job_id: str):
+    """Run a stored job in a Celery worker process."""
+    asyncio.run(_run(job_id))
+
+
+async def _run(job_id: str):
+    # Pooled connections belong to the event loop of this task.
+    try:
+        await run_job(job_id)
+    finally:
+        await database.dispose_engines()
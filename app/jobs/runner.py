@@ -0,0 +1,15 @@
+from typing import List
+from app import database
+from app.services.job_service import JobService
+
+
+async def run_job(job_id: str):
+    """Run a stored job in its own session, outside of any request."""
+    async with database.get_session_factory()() as db:
+        await JobService(db).run(job_id)
+
+
+async def get_runnable_job_ids() -> List[str]:
+    """Get the ids of the jobs that are waiting to run or whose run was lost."""
+    async with database.get_session_factory()() as db:
+        return await JobService(db).get_runnable_ids()
@@ -1,13 +1,71 @@
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 import uvicorn
-from app.routers import users, login, receipt
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.future import select
+from app import database
+from app.config import settings
+from app.enums.sort_order import SortOrder
+from app.models.user import User
+from app.metrics import MetricsMiddleware
+from app.partitions import ensure_partitions
+from app.profiling import ProfilingMiddleware
+from app.jobs.broker import broker
+from app.routers import users, login, receipt, jobs, internal, metrics
+from app.services.receipt_service import ReceiptService
 
+logger = logging.getLogger(__name__)
 
-app = FastAPI()
+
+def hot_statements():
+    """Queries prepared on every warm connection, as issued by the services."""
+    return [
+        select(User).filter(User.id == 0),
+        ReceiptService._order_by_position(
+            ReceiptService._filter_by_owner(0), SortOrder.DESC
+        )
+        .offset(0)
+        .limit(10),
+    ]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        await ensure_partitions(database.get_engine())
+    except (SQLAlchemyError, OSError) as ex:
+        logger.warning("Creating receipt partitions failed: %s", ex)
+    await database.warm_up(
+        database.get_engine(), settings.DB_WARMUP_CONNECTIONS, hot_statements()
+    )
+    if settings.DB_REPLICA_URL:
+        await database.warm_up(
+            database.get_replica_engine(), settings.DB_WARMUP_CONNECTIONS, hot_statements()
+        )
+    try:
+        resubmitted = await broker.resubmit()
+    except (SQLAlchemyError, OSError) as ex:
+        logger.warning("Resubmitting pending jobs failed: %s", ex)
+    else:
+        if resubmitted:
+            logger.info("Resubmitted %d pending or lost jobs", resubmitted)
+    yield
+    await broker.close()
+    await database.dispose_engines()
+
+
+app = FastAPI(lifespan=lifespan)
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(users.router)
 app.include_router(login.router)
 app.include_router(receipt.router)
+app.include_router(jobs.router)
+app.include_router(internal.router)
+app.include_router(metrics.router)
 
 
 @app.get("/")
@@ -0,0 +1,131 @@
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+from prometheus_client import Counter, Histogram
+from sqlalchemy import Engine, event
+
+
+REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by route and status code.",
+    ["method", "route", "status"],
+)
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route.",
+    ["method", "route"],
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Database queries executed per HTTP request.",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 10, 25, 50, 100, 250),
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds",
+    "Time spent in database queries per HTTP request.",
+    ["method", "route"],
+)
+
+
+# Labelled series per (method, route), looked up once instead of on every request.
+_route_series: Dict[Tuple[str, str], tuple] = {}
+
+
+def _series(method: str, route: str) -> tuple:
+    series = _route_series.get((method, route))
+    if series is None:
+        series = _route_series[(method, route)] = (
+            REQUEST_SECONDS.labels(method, route),
+            REQUEST_DB_QUERIES.labels(method, route),
+            REQUEST_DB_SECONDS.labels(method, route),
+        )
+    return series
+
+
+class RequestDbStats:
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        """
+        Database work done while handling a single request.
+        Attributes:
+            queries (int): Number of executed statements.
+            seconds (float): Time spent executing them.
+        """
+        self.queries = 0
+        self.seconds = 0.0
+
+
+request_db_stats: ContextVar[Optional[RequestDbStats]] = ContextVar(
+    "request_db_stats", default=None
+)
+# Executed statements with their timings, collected only for profiled requests.
+request_statements: ContextVar[Optional[List[dict]]] = ContextVar(
+    "request_statements", default=None
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if request_db_stats.get() is not None or request_statements.get() is not None:
+        conn.info["query_started_at"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started_at = conn.info.pop("query_started_at", None)
+    if started_at is None:
+        return
+    elapsed = time.perf_counter() - started_at
+    stats = request_db_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds += elapsed
+    statements = request_statements.get()
+    if statements is not None:
+        statements.append({"statement": statement, "seconds": elapsed})
+
+
+def instrument_engine(engine: Engine):
+    """Count the statements and database time of the current request on an engine."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        """
+        ASGI middleware recording latency, status and database work per route.
+        Routes are labelled by their path template, so the number of series
+        stays bounded; requests that match no route share one label.
+        """
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        stats = RequestDbStats()
+        token = request_db_stats.set(stats)
+        started_at = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started_at
+            request_db_stats.reset(token)
+            route = scope.get("route")
+            method = scope["method"]
+            path = route.path if route is not None else "unmatched"
+            seconds, db_queries, db_seconds = _series(method, path)
+            REQUESTS.labels(method, path, str(status_code)).inc()
+            seconds.observe(elapsed)
+            db_queries.observe(stats.queries)
+            db_seconds.observe(stats.seconds)
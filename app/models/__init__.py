@@ -1,5 +1,7 @@
 from app.models.user import User
 from app.models.receipt import Receipt
 from app.models.receipt_item import ReceiptItem
+from app.models.receipt_stats import ReceiptDailyStats
+from app.models.job import Job
 
-__all__ = ["User", "Receipt", "ReceiptItem"]
\ No newline at end of file
+__all__ = ["User", "Receipt", "ReceiptItem", "ReceiptDailyStats", "Job"]
\ No newline at end of file
@@ -0,0 +1,36 @@
+from sqlalchemy import (
+    JSON,
+    Column,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Integer,
+    LargeBinary,
+    String,
+)
+from sqlalchemy.orm import deferred
+from app.database import Base
+from app.enums.job_kind import JobKind
+from app.enums.job_status import JobStatus
+
+
+class Job(Base):
+    """Background work submitted by a user and run by the job broker."""
+
+    __tablename__ = "jobs"
+    id = Column(String(32), primary_key=True)
+    kind = Column(Enum(JobKind), nullable=False)
+    status = Column(Enum(JobStatus), nullable=False, default=JobStatus.PENDING)
+    params = Column(JSON, nullable=False, default=dict)
+    owner_id = Column(Integer, ForeignKey("users.id"), index=True)
+    error = Column(String)
+    # Result of jobs finished before results were written to files; loaded
+    # only when the result is downloaded, not when the status is polled.
+    result = deferred(Column(LargeBinary))
+    # Name of the result file in JOB_RESULT_DIR.
+    result_file = Column(String)
+    result_media_type = Column(String)
+    result_filename = Column(String)
+    created_at = Column(DateTime, nullable=False)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DECIMAL, DateTime, ForeignKey, Enum
+from sqlalchemy import DDL, Column, Integer, BigInteger, DateTime, ForeignKey, Enum, Index, event
 from sqlalchemy.orm import relationship
 from app.database import Base
 from app.enums.receipt_payment import PaymentType
@@ -6,13 +6,38 @@ from app.enums.receipt_payment import PaymentType
 
 class Receipt(Base):
     __tablename__ = "receipts"
-    id = Column(Integer, primary_key=True, index=True)
-    total = Column(DECIMAL(10, 2))
-    rest = Column(DECIMAL(10, 2))
+    __table_args__ = (
+        Index("ix_receipts_owner_id_created_at_id", "owner_id", "created_at", "id"),
+        Index(
+            "ix_receipts_owner_id_payment_type_created_at_id",
+            "owner_id",
+            "payment_type",
+            "created_at",
+            "id",
+        ),
+        Index("ix_receipts_owner_id_total", "owner_id", "total"),
+        # Range partitioned by month of creation, see app/partitions.py.
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    # Amounts are stored in kopecks.
+    total = Column(BigInteger)
+    rest = Column(BigInteger)
     payment_type = Column(Enum(PaymentType))
-    payment_amount = Column(DECIMAL(10, 2))
-    created_at = Column(DateTime)
+    payment_amount = Column(BigInteger)
+    # The partition key has to be part of the primary key.
+    created_at = Column(DateTime, primary_key=True)
     owner_id = Column(Integer, ForeignKey("users.id"))
 
     owner = relationship("User", back_populates="receipts")
-    items = relationship("ReceiptItem", back_populates="receipt")
\ No newline at end of file
+    items = relationship("ReceiptItem", back_populates="receipt")
+
+
+# Rows of months without a partition of their own land here.
+event.listen(
+    Receipt.__table__,
+    "after_create",
+    DDL("CREATE TABLE receipts_default PARTITION OF receipts DEFAULT").execute_if(
+        dialect="postgresql"
+    ),
+)
@@ -1,15 +1,55 @@
-from sqlalchemy import Column, Integer, String, DECIMAL, ForeignKey
+from sqlalchemy import (
+    DDL,
+    Column,
+    Integer,
+    BigInteger,
+    DateTime,
+    String,
+    ForeignKeyConstraint,
+    Index,
+    event,
+)
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 
 class ReceiptItem(Base):
     __tablename__ = "receipt_items"
-    id = Column(Integer, primary_key=True, index=True)
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["receipt_id", "receipt_created_at"], ["receipts.id", "receipts.created_at"]
+        ),
+        # Trigram index serving product-name search (ILIKE and word similarity).
+        Index(
+            "ix_receipt_items_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        # Partitioned by month like receipts, on the creation time of the receipt.
+        {"postgresql_partition_by": "RANGE (receipt_created_at)"},
+    )
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     name = Column(String)
-    price = Column(DECIMAL(10, 2))
+    # Amounts are stored in kopecks.
+    price = Column(BigInteger)
     quantity = Column(Integer)
-    total = Column(DECIMAL(10, 2))
-    receipt_id = Column(Integer, ForeignKey("receipts.id"))
+    total = Column(BigInteger)
+    receipt_id = Column(Integer, index=True)
+    receipt_created_at = Column(DateTime, primary_key=True)
 
-    receipt = relationship("Receipt", back_populates="items")
\ No newline at end of file
+    receipt = relationship("Receipt", back_populates="items")
+
+
+event.listen(
+    ReceiptItem.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+event.listen(
+    ReceiptItem.__table__,
+    "after_create",
+    DDL("CREATE TABLE receipt_items_default PARTITION OF receipt_items DEFAULT").execute_if(
+        dialect="postgresql"
+    ),
+)
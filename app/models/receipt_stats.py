@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, BigInteger, Date, ForeignKey, Enum
+from app.database import Base
+from app.enums.receipt_payment import PaymentType
+
+
+class ReceiptDailyStats(Base):
+    """Per-day receipt totals of a user, updated on every receipt creation."""
+
+    __tablename__ = "receipt_daily_stats"
+    owner_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    payment_type = Column(Enum(PaymentType), primary_key=True)
+    receipts_count = Column(Integer, nullable=False, default=0)
+    # Sum of receipt totals in kopecks.
+    total = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,34 @@
+from decimal import Decimal, ROUND_HALF_UP
+
+# Amounts are stored and computed as integer kopecks; hryvnias only appear at
+# the API and text-rendering edges.
+MINOR_UNITS = 100
+
+# Input bounds, in hryvnias and units, keeping every kopeck amount of a receipt
+# far below the BIGINT maximum (about 9.2e18): a receipt totals at most
+# MAX_PAYMENT, i.e. 1e15 kopecks. MIN_AMOUNT is the smallest amount that does
+# not round to zero kopecks.
+MIN_AMOUNT = 0.005
+MAX_PRICE = 1_000_000
+MAX_QUANTITY = 1_000
+MAX_PRODUCTS = 10_000
+MAX_PAYMENT = MAX_PRICE * MAX_QUANTITY * MAX_PRODUCTS
+
+
+def to_minor(amount) -> int:
+    """Convert an amount in hryvnias to kopecks, rounding half up."""
+    return int(
+        (Decimal(str(amount)) * MINOR_UNITS).quantize(Decimal(1), rounding=ROUND_HALF_UP)
+    )
+
+
+def from_minor(amount: int) -> float:
+    """Convert an amount in kopecks to hryvnias."""
+    return amount / MINOR_UNITS
+
+
+def format_minor(amount: int) -> str:
+    """Format an amount in kopecks as hryvnias, e.g. `1 234.50`."""
+    sign = "-" if amount < 0 else ""
+    whole, fraction = divmod(abs(amount), MINOR_UNITS)
+    return f"{sign}{whole:,}.{fraction:02d}".replace(",", " ")
@@ -0,0 +1,68 @@
+import logging
+from datetime import date, datetime
+from typing import Dict, Optional
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.sql import text
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Tables range partitioned by month; receipt_items is keyed by the creation
+# time of its receipt, so both tables have a partition for every month.
+PARTITIONED_TABLES = ("receipts", "receipt_items")
+
+
+def month_start(day: date, months: int = 0) -> date:
+    """Return the first day of the month `months` months after the one of `day`."""
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_y{month:%Y}m{month:%m}"
+
+
+async def ensure_partitions(
+    engine: AsyncEngine,
+    months_ahead: int = settings.PARTITION_MONTHS_AHEAD,
+    today: Optional[date] = None,
+) -> Dict[str, list]:
+    """Create the partitions of the current month and of `months_ahead` months after it.
+
+    A month has to get its partitions before it starts: its rows go to the
+    default partition otherwise, and a month with rows there can no longer
+    get a partition of its own. Every partition is created in its own
+    transaction, so one that fails does not keep the others from being
+    created. Returns the names of the created partitions and the failed
+    ones with their errors.
+    """
+    today = today or datetime.utcnow().date()
+    async with engine.connect() as conn:
+        result = await conn.execute(
+            text("SELECT relname FROM pg_class WHERE relispartition")
+        )
+        existing = set(result.scalars())
+
+    created = []
+    failed = []
+    for months in range(months_ahead + 1):
+        month = month_start(today, months)
+        for table in PARTITIONED_TABLES:
+            name = partition_name(table, month)
+            if name in existing:
+                continue
+            try:
+                async with engine.begin() as conn:
+                    await conn.execute(
+                        text(
+                            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+                            f"FOR VALUES FROM ('{month}') TO ('{month_start(month, 1)}')"
+                        )
+                    )
+            except SQLAlchemyError as ex:
+                logger.warning("Creating partition %s failed: %s", name, ex)
+                failed.append({"partition": name, "error": str(getattr(ex, "orig", None) or ex)})
+            else:
+                created.append(name)
+    return {"created": created, "failed": failed}
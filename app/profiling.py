@@ -0,0 +1,123 @@
+import hmac
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from starlette.datastructures import Headers
+from app.cache import create_cache
+from app.config import settings
+from app.metrics import request_statements
+
+
+profiles = create_cache(
+    "profiles", settings.PROFILE_STORE_SIZE, settings.PROFILE_TTL, settings.CACHE_URL
+)
+
+# Sampled stacks are those of the whole event loop thread, not of one request.
+STACKS_SCOPE = "process"
+
+
+class StackSampler:
+    def __init__(self, thread_id: int, interval: float):
+        """
+        Samples the stack of a thread from a background thread.
+        Stacks are kept in the folded format read by flamegraph.pl and speedscope.
+        Attributes:
+            thread_id (int): Identifier of the sampled thread.
+            interval (float): Seconds between samples.
+        """
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def folded(self) -> list:
+        """Return the sampled stacks as `frame;frame;frame count` lines."""
+        return [f"{stack} {count}" for stack, count in self.stacks.most_common()]
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if frames:
+                self.stacks[";".join(reversed(frames))] += 1
+
+
+class ProfilingMiddleware:
+    def __init__(self, app, interval: float = settings.PROFILE_SAMPLE_INTERVAL):
+        """
+        ASGI middleware profiling requests sent with the internal token in the
+        X-Profile header. The event loop thread is sampled while the request
+        runs, so the stacks are process-wide: stacks of requests handled
+        concurrently show up too, and the profile says so in `stacks_scope`.
+        The profile is kept in the `profiles` store under the id returned in
+        the X-Profile-Id header.
+        """
+        self.app = app
+        self.interval = interval
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+        status_code = 500
+
+        async def send_with_profile_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-profile-id", profile_id.encode()),
+                ]
+            await send(message)
+
+        statements = []
+        token = request_statements.set(statements)
+
+        sampler = StackSampler(threading.get_ident(), self.interval)
+        sampler.start()
+        started_at = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            elapsed = time.perf_counter() - started_at
+            sampler.stop()
+            request_statements.reset(token)
+            await profiles.set(
+                (profile_id,),
+                {
+                    "id": profile_id,
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "query": scope["query_string"].decode("latin-1"),
+                    "status": status_code,
+                    "seconds": elapsed,
+                    "db_seconds": sum(s["seconds"] for s in statements),
+                    "statements": statements,
+                    "stacks_scope": STACKS_SCOPE,
+                    "stacks": sampler.folded(),
+                },
+            )
+
+    @staticmethod
+    def _requested(scope) -> bool:
+        value = Headers(scope=scope).get("x-profile")
+        if value is None or not settings.INTERNAL_API_TOKEN:
+            return False
+        return hmac.compare_digest(value.encode(), settings.INTERNAL_API_TOKEN.encode())
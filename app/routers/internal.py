@@ -0,0 +1,80 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from app.cache import caches
+from app import database
+from app.dependencies import verify_internal_token
+from app.exceptions import EntityNotFoundException
+from app.jobs.broker import broker
+from app.partitions import ensure_partitions
+from app.profiling import STACKS_SCOPE, profiles
+from app.utils import password_hasher
+
+router = APIRouter(
+    prefix="/internal",
+    tags=["internal"],
+    dependencies=[Depends(verify_internal_token)],
+)
+
+
+@router.get("/caches")
+async def get_cache_stats():
+    """Get the hit/miss counters of every cache."""
+    return {name: cache.stats() for name, cache in caches.items()}
+
+
+@router.delete("/caches/{name}")
+async def clear_cache(name: str):
+    """Drop every entry of a cache."""
+    cache = caches.get(name)
+    if cache is None:
+        raise EntityNotFoundException("Cache")
+    await cache.clear()
+    return cache.stats()
+
+
+@router.get("/password-hasher")
+async def get_password_hasher_stats():
+    """Get the counters of the password hashing pool."""
+    return password_hasher.stats()
+
+
+@router.get("/jobs")
+async def get_job_broker_stats():
+    """Get the counters of the job broker."""
+    return broker.stats()
+
+
+@router.post("/partitions")
+async def create_partitions():
+    """Create the receipt partitions of the coming months; run it from a daily cron."""
+    return await ensure_partitions(database.get_engine())
+
+
+@router.get("/pool")
+async def get_pool_stats():
+    """Get the state and checkout counters of the database connection pool."""
+    return database.get_engine().pool.stats()
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str):
+    """Get the SQL statements and sampled stacks of a profiled request."""
+    profile = await profiles.get((profile_id,))
+    if profile is None:
+        raise EntityNotFoundException("Profile")
+    return profile
+
+
+@router.get("/profiles/{profile_id}/folded", response_class=PlainTextResponse)
+async def get_profile_folded_stacks(profile_id: str):
+    """Get the sampled stacks of a profiled request in the folded flamegraph format.
+
+    The stacks are process-wide, which the X-Stacks-Scope header states.
+    """
+    profile = await profiles.get((profile_id,))
+    if profile is None:
+        raise EntityNotFoundException("Profile")
+    return PlainTextResponse(
+        "\n".join(profile["stacks"]),
+        headers={"X-Stacks-Scope": STACKS_SCOPE},
+    )
@@ -0,0 +1,60 @@
+from fastapi import APIRouter, Depends, Response
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.schemas.job import Job, JobCreate
+from app.schemas.user import User
+from app.services.job_service import JobService
+from app.dependencies import get_db, get_current_user
+from app.database import get_read_db
+from app.jobs.broker import broker
+
+router = APIRouter(
+    prefix="/jobs",
+    tags=["jobs"],
+)
+
+
+@router.post("/", response_model=Job, status_code=202)
+async def create_job(
+    job_create: JobCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Submit a background job; poll it with `GET /jobs/{job_id}`."""
+    job_service = JobService(db)
+    job = await job_service.create(job_create, current_user.id)
+    await broker.submit(job.id)
+    return job
+
+
+@router.get("/{job_id}", response_model=Job)
+async def get_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Get the status of a job."""
+    job_service = JobService(db)
+    return await job_service.get_job(job_id, current_user.id)
+
+
+@router.get("/{job_id}/result")
+async def get_job_result(
+    job_id: str,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Download the result of a finished job."""
+    job_service = JobService(db)
+    job = await job_service.get_result(job_id, current_user.id)
+    if job.result_file is not None:
+        return FileResponse(
+            job_service.result_path(job.result_file),
+            media_type=job.result_media_type,
+            filename=job.result_filename,
+        )
+    return Response(
+        content=job.result,
+        media_type=job.result_media_type,
+        headers={"Content-Disposition": f'attachment; filename="{job.result_filename}"'},
+    )
@@ -0,0 +1,14 @@
+from fastapi import APIRouter, Depends, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from app.dependencies import verify_internal_token
+
+router = APIRouter(
+    tags=["metrics"],
+    dependencies=[Depends(verify_internal_token)],
+)
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """Get the request and database metrics in the Prometheus text format."""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -1,13 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.schemas.receipt import ReceiptCreate, Receipt
-from app.services.receipt_service import ReceiptService
+from app.schemas.receipt import (
+    ReceiptCreate,
+    Receipt,
+    ReceiptBatchCreate,
+    ReceiptBatchResult,
+    ReceiptTextBatch,
+    ReceiptStats,
+    receipt_list_adapter,
+)
+from app.services.receipt_service import (
+    EXPORT_MEDIA_TYPES,
+    TEXT_BATCH_MEDIA_TYPES,
+    ReceiptService,
+)
+from app.config import settings
 from app.dependencies import get_db, get_current_user
+from app.database import get_read_db, get_read_session_factory
 from app.schemas.user import User
 from typing import List, Optional
-from datetime import datetime
+from datetime import date, datetime
 from app.enums.receipt_payment import PaymentType
-from fastapi.responses import Response
+from app.enums.sort_order import SortOrder
+from app.enums.export_format import ExportFormat, TextBatchFormat
+from app.enums.stats_period import StatsPeriod
+from app.enums.search_mode import SearchMode
+from app.utils import encode_cursor, decode_cursor, etag_matches, make_etag
+from app.idempotency import idempotent
+from fastapi.responses import Response, StreamingResponse
 
 router = APIRouter(
     prefix="/receipts",
@@ -15,19 +35,69 @@ router = APIRouter(
 )
 
 
+def receipt_page(receipts: List[Receipt], limit: int) -> Response:
+    """Serialize a page of receipts, with the cursor of the next page if it is full."""
+    response = Response(
+        content=receipt_list_adapter.dump_json(receipts), media_type="application/json"
+    )
+    if receipts and len(receipts) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(
+            receipts[-1].created_at, receipts[-1].id
+        )
+    return response
+
+
+# Lists change with every new receipt, so caches revalidate them on each use.
+LIST_CACHE_CONTROL = "private, no-cache"
+
+
+def immutable_cache_control(visibility: str) -> str:
+    return f"{visibility}, max-age={settings.RECEIPT_MAX_AGE}, immutable"
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+
 @router.post("/", response_model=Receipt)
 async def create_receipt(
     receipt_create: ReceiptCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    """Create a receipt.
+
+    Retries sent with the same `Idempotency-Key` header get the response of
+    the first request instead of creating another receipt.
+    """
+    receipt_service = ReceiptService(db)
+    if idempotency_key is None:
+        return await receipt_service.create(receipt_create, current_user.id)
+    return await idempotent(
+        ("receipts", current_user.id, idempotency_key),
+        receipt_create,
+        Receipt,
+        lambda: receipt_service.create(receipt_create, current_user.id),
+        response,
+    )
+
+
+@router.post("/batch", response_model=ReceiptBatchResult)
+async def create_receipts_batch(
+    receipt_batch: ReceiptBatchCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Create many receipts at once, reporting validation errors per receipt."""
     receipt_service = ReceiptService(db)
-    receipt = await receipt_service.create(receipt_create, current_user.id)
-    return receipt
+    return await receipt_service.create_many(receipt_batch.receipts, current_user.id)
 
 
 @router.get("/", response_model=List[Receipt])
 async def get_receipts(
+    request: Request,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
     min_total: Optional[float] = None,
@@ -35,10 +105,33 @@ async def get_receipts(
     payment_type: Optional[PaymentType] = None,
     limit: int = 10,
     offset: int = 0,
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = None,
+    order: SortOrder = SortOrder.DESC,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
+    """Get the receipts of the current user.
+
+    A full page carries an `X-Next-Cursor` header; pass it back as `cursor`
+    to fetch the next page. Receipts come from the database already valid,
+    so they are serialized directly instead of being validated again
+    against the response model.
+
+    The weak ETag of a page changes with the newest receipt of the user, so
+    a matching `If-None-Match` gets a 304 without the page being loaded.
+    """
     receipt_service = ReceiptService(db)
+    etag = make_etag(
+        "receipts",
+        current_user.id,
+        await receipt_service.get_latest_id(current_user.id),
+        request.url.query,
+        weak=True,
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, LIST_CACHE_CONTROL)
+
     receipts = await receipt_service.get_by_owner(
         current_user.id,
         start_date,
@@ -48,23 +141,178 @@ async def get_receipts(
         payment_type,
         limit,
         offset,
+        decode_cursor(cursor) if cursor else None,
+        order,
+    )
+    response = receipt_page(receipts, limit)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = LIST_CACHE_CONTROL
+    return response
+
+
+@router.get("/search", response_model=List[Receipt])
+async def search_receipts(
+    q: str = Query(..., min_length=2, max_length=100),
+    mode: SearchMode = SearchMode.CONTAINS,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    min_total: Optional[float] = None,
+    max_total: Optional[float] = None,
+    payment_type: Optional[PaymentType] = None,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    order: SortOrder = SortOrder.DESC,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Find the receipts of the current user by product name.
+
+    Pages are chained with the `X-Next-Cursor` header like `GET /receipts/`.
+    """
+    receipt_service = ReceiptService(db)
+    receipts = await receipt_service.search(
+        current_user.id,
+        q,
+        mode,
+        start_date,
+        end_date,
+        min_total,
+        max_total,
+        payment_type,
+        limit,
+        decode_cursor(cursor) if cursor else None,
+        order,
+    )
+    return receipt_page(receipts, limit)
+
+
+@router.get("/stats", response_model=List[ReceiptStats])
+async def get_receipt_stats(
+    group_by: StatsPeriod = StatsPeriod.DAY,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    payment_type: Optional[PaymentType] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Get spending totals of the current user by period and payment type."""
+    receipt_service = ReceiptService(db)
+    return await receipt_service.get_stats(
+        current_user.id, group_by, start_date, end_date, payment_type
+    )
+
+
+@router.get("/export")
+async def export_receipts(
+    format: ExportFormat = ExportFormat.NDJSON,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    min_total: Optional[float] = None,
+    max_total: Optional[float] = None,
+    payment_type: Optional[PaymentType] = None,
+    session_factory=Depends(get_read_session_factory),
+    current_user: User = Depends(get_current_user),
+):
+    """Stream all receipts of the current user as NDJSON or CSV."""
+
+    async def content():
+        async with session_factory() as db:
+            receipt_service = ReceiptService(db)
+            async for chunk in receipt_service.export(
+                format,
+                current_user.id,
+                start_date,
+                end_date,
+                min_total,
+                max_total,
+                payment_type,
+            ):
+                yield chunk
+
+    return StreamingResponse(
+        content(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="receipts.{format.value}"'
+        },
+    )
+
+
+@router.post("/text/batch")
+async def get_receipt_texts(
+    receipt_batch: ReceiptTextBatch,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Render many receipts as one text stream or as a ZIP of text files."""
+    receipt_service = ReceiptService(db)
+    receipts = await receipt_service.get_for_rendering(
+        receipt_batch.receipt_ids, current_user.id
+    )
+    headers = {}
+    if receipt_batch.format == TextBatchFormat.ZIP:
+        headers["Content-Disposition"] = 'attachment; filename="receipts.zip"'
+    return StreamingResponse(
+        ReceiptService.render_batch(
+            receipts, receipt_batch.line_length, receipt_batch.format
+        ),
+        media_type=TEXT_BATCH_MEDIA_TYPES[receipt_batch.format],
+        headers=headers,
     )
-    return receipts
 
 
 @router.get("/{receipt_id}/text")
 async def get_receipt_text(
-    receipt_id: int, line_length: int = 40, db: AsyncSession = Depends(get_db)
+    receipt_id: int,
+    line_length: int = 40,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    """Get a receipt in text format by its ID."""
+    """Get a receipt in text format by its ID.
+
+    Receipts never change, so the text is sent with a strong ETag and may be
+    cached for good; a matching `If-None-Match` gets a 304 without rendering,
+    and `If-None-Match: *` gets one once the receipt is found.
+    """
+    etag = make_etag("receipt_text", receipt_id, line_length)
+    cache_control = immutable_cache_control("public")
+    if etag_matches(if_none_match, etag, exists=False):
+        return not_modified(etag, cache_control)
+
     receipt_service = ReceiptService(db)
     receipt_text = await receipt_service.get_receipt_text(receipt_id, line_length)
-    return Response(content=receipt_text, media_type="text/plain")
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, cache_control)
+    return Response(
+        content=receipt_text,
+        media_type="text/plain",
+        headers={"ETag": etag, "Cache-Control": cache_control},
+    )
 
 
 @router.get("/{receipt_id}", response_model=Receipt)
 async def get_receipt(
-    receipt_id: int, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    receipt_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
 ):
+    """Get a receipt of the current user by its ID.
+
+    The ETag is only ever sent to the owner of the receipt, so a matching
+    `If-None-Match` gets a 304 without the receipt being loaded;
+    `If-None-Match: *` gets one once the receipt is found.
+    """
+    etag = make_etag("receipt", receipt_id, current_user.id)
+    cache_control = immutable_cache_control("private")
+    if etag_matches(if_none_match, etag, exists=False):
+        return not_modified(etag, cache_control)
+
     receipt_service = ReceiptService(db)
-    return await receipt_service.get_receipt(receipt_id, current_user.id)
\ No newline at end of file
+    receipt = await receipt_service.get_receipt(receipt_id, current_user.id)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, cache_control)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    return receipt
\ No newline at end of file
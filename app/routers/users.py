@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.user import UserCreate, UserUpdate, User
 from app.services.user_service import UserService
 from app.database import get_db
+from app.idempotency import idempotent
 
 router = APIRouter(
     prefix="/users",
@@ -11,9 +13,27 @@ router = APIRouter(
 
 
 @router.post("/", response_model=User)
-async def create_user(user_create: UserCreate, db: AsyncSession = Depends(get_db)):
+async def create_user(
+    user_create: UserCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    db: AsyncSession = Depends(get_db),
+):
+    """Create a user; retries with the same `Idempotency-Key` replay the first response.
+
+    Registrations have no user to scope their keys to, so keys are scoped to
+    the requested username instead.
+    """
     user_service = UserService(db)
-    return await user_service.create(user_create)
+    if idempotency_key is None:
+        return await user_service.create(user_create)
+    return await idempotent(
+        ("users", user_create.username, idempotency_key),
+        user_create,
+        User,
+        lambda: user_service.create(user_create),
+        response,
+    )
 
 
 @router.patch("/{id}", response_model=User)
@@ -0,0 +1,53 @@
+from pydantic import BaseModel, Field, ValidationInfo, field_validator
+from typing import Any, Dict, Optional
+from datetime import datetime
+from app.enums.export_format import ExportFormat
+from app.enums.job_kind import JobKind
+from app.enums.job_status import JobStatus
+from app.enums.receipt_payment import PaymentType
+from app.schemas.receipt import ReceiptTextBatch
+
+
+class ReceiptExport(BaseModel):
+    format: ExportFormat = Field(ExportFormat.NDJSON, description="The file format.")
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    min_total: Optional[float] = None
+    max_total: Optional[float] = None
+    payment_type: Optional[PaymentType] = None
+
+
+# Parameters of each job kind; kinds missing here take no parameters.
+JOB_PARAMS = {
+    JobKind.EXPORT: ReceiptExport,
+    JobKind.REPRINT: ReceiptTextBatch,
+}
+
+
+class JobCreate(BaseModel):
+    kind: JobKind = Field(..., description="The kind of work to run.")
+    params: Dict[str, Any] = Field(
+        default_factory=dict, description="The parameters of the job kind."
+    )
+
+    @field_validator("params")
+    @classmethod
+    def validate_params(cls, params: Dict[str, Any], info: ValidationInfo):
+        schema = JOB_PARAMS.get(info.data.get("kind"))
+        if schema is None:
+            return {}
+        return schema.model_validate(params).model_dump(mode="json")
+
+
+class Job(BaseModel):
+    id: str
+    kind: JobKind
+    status: JobStatus
+    params: Dict[str, Any]
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
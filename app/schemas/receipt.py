@@ -1,18 +1,32 @@
-from pydantic import BaseModel
-from typing import List
-from datetime import datetime
+from pydantic import BaseModel, TypeAdapter
+from typing import Any, Dict, List, Optional
+from datetime import date, datetime
 from app.enums.receipt_payment import PaymentType
+from app.enums.export_format import TextBatchFormat
+from app.money import (
+    MAX_PAYMENT,
+    MAX_PRICE,
+    MAX_PRODUCTS,
+    MAX_QUANTITY,
+    MIN_AMOUNT,
+    from_minor,
+    to_minor,
+)
 from pydantic import model_validator, field_validator, Field
 
 
 class Product(BaseModel):
     name: str = Field(..., min_length=1, max_length=255, description="The name of the product.")
-    price: float = Field(..., gt=0, description="The price of the product.")
-    quantity: int = Field(..., gt=0, description="The quantity of the product.")
+    price: float = Field(
+        ..., ge=MIN_AMOUNT, le=MAX_PRICE, description="The price of the product."
+    )
+    quantity: int = Field(..., gt=0, le=MAX_QUANTITY, description="The quantity of the product.")
 
 class Payment(BaseModel):
     type: PaymentType = Field(..., description="The type of payment.")
-    amount: float = Field(..., gt=0, description="The payment amount.")
+    amount: float = Field(
+        ..., ge=MIN_AMOUNT, le=MAX_PAYMENT, description="The payment amount."
+    )
 
     @field_validator("amount")
     def round_amount(cls, value):
@@ -21,24 +35,36 @@ class Payment(BaseModel):
 
 
 class ReceiptCreate(BaseModel):
-    products: List[Product] = Field(..., min_length=1, description="The list of products.")
+    products: List[Product] = Field(
+        ..., min_length=1, max_length=MAX_PRODUCTS, description="The list of products."
+    )
     payment: Payment = Field(..., description="The payment information.")
 
+    @property
+    def total_minor(self) -> int:
+        """Calculate the total cost of all products in kopecks."""
+        return sum(to_minor(item.price) * item.quantity for item in self.products)
+
+    @property
+    def rest_minor(self) -> int:
+        """Calculate the rest (change) in kopecks."""
+        return to_minor(self.payment.amount) - self.total_minor
+
     @property
     def total(self) -> float:
         """Calculate the total cost of all products in the receipt."""
-        return sum(item.price * item.quantity for item in self.products)
+        return from_minor(self.total_minor)
 
     @property
     def rest(self) -> float:
         """Calculate the rest (change) based on the payment amount."""
-        return self.payment.amount - self.total
+        return from_minor(self.rest_minor)
 
     @model_validator(mode="after")
     def validate_payment_amount(self):
         """Validate that the payment amount is not less than the total cost of products."""
 
-        if self.payment.amount < self.total:
+        if self.rest_minor < 0:
             raise ValueError(
                 "The payment amount cannot be less than the total cost of products."
             )
@@ -46,14 +72,14 @@ class ReceiptCreate(BaseModel):
         return self
 
     def prepare_receipt_data(self, owner_id: int) -> dict:
-        """Prepare the data for creating a Receipt model."""
+        """Prepare the data for creating a Receipt model, with amounts in kopecks."""
         return {
             "owner_id": owner_id,
             "created_at": datetime.utcnow(),
-            "total": self.total,
-            "rest": self.rest,
+            "total": self.total_minor,
+            "rest": self.rest_minor,
             "payment_type": self.payment.type,
-            "payment_amount": self.payment.amount,
+            "payment_amount": to_minor(self.payment.amount),
         }
 
 
@@ -72,12 +98,84 @@ class Receipt(ReceiptCreate):
         """Create a Receipt schema from ORM model with products."""
         return cls(
             id=receipt.id,
-            total=receipt.total,
-            rest=receipt.rest,
-            payment_type=receipt.payment_type,
-            payment_amount=receipt.payment_amount,
+            total=from_minor(receipt.total),
+            rest=from_minor(receipt.rest),
             created_at=receipt.created_at,
             owner_id=receipt.owner_id,
             products=products,
-            payment=Payment(type=receipt.payment_type, amount=receipt.payment_amount),
+            payment=Payment(
+                type=receipt.payment_type, amount=from_minor(receipt.payment_amount)
+            ),
+        )
+
+    @classmethod
+    def from_orm_trusted(cls, receipt):
+        """Create a Receipt schema from an ORM model loaded with its items.
+
+        Stored receipts were validated when they were created, so the schema is
+        built with `model_construct` and the validators are not run again.
+        """
+        return cls.model_construct(
+            id=receipt.id,
+            total=from_minor(receipt.total),
+            rest=from_minor(receipt.rest),
+            created_at=receipt.created_at,
+            owner_id=receipt.owner_id,
+            products=[
+                Product.model_construct(
+                    name=item.name, price=from_minor(item.price), quantity=item.quantity
+                )
+                for item in receipt.items
+            ],
+            payment=Payment.model_construct(
+                type=receipt.payment_type, amount=from_minor(receipt.payment_amount)
+            ),
         )
+
+
+
+# Serializes trusted receipts straight to JSON, bypassing response validation.
+receipt_list_adapter = TypeAdapter(List[Receipt])
+
+class ReceiptBatchCreate(BaseModel):
+    receipts: List[Dict[str, Any]] = Field(
+        ...,
+        min_length=1,
+        max_length=1000,
+        description="Receipt payloads; each one is validated on its own.",
+    )
+
+
+class ReceiptBatchItemResult(BaseModel):
+    index: int = Field(..., description="The position of the receipt in the batch.")
+    receipt: Optional[Receipt] = Field(None, description="The created receipt.")
+    errors: Optional[List[Dict[str, Any]]] = Field(
+        None, description="The validation errors of a rejected receipt."
+    )
+
+
+class ReceiptBatchResult(BaseModel):
+    created: int = Field(..., description="The number of created receipts.")
+    failed: int = Field(..., description="The number of rejected receipts.")
+    results: List[ReceiptBatchItemResult] = Field(
+        ..., description="Per-receipt results in submission order."
+    )
+
+
+class ReceiptTextBatch(BaseModel):
+    receipt_ids: List[int] = Field(
+        ..., min_length=1, max_length=1000, description="The IDs of the receipts."
+    )
+    line_length: int = Field(40, gt=0, description="The width of the receipt text.")
+    format: TextBatchFormat = Field(
+        TextBatchFormat.TEXT,
+        description="One concatenated text stream or a ZIP with a file per receipt.",
+    )
+
+
+class ReceiptStats(BaseModel):
+    period: date = Field(..., description="The first day of the period.")
+    payment_type: PaymentType = Field(..., description="The type of payment.")
+    count: int = Field(..., description="The number of receipts.")
+    total: float = Field(..., description="The total cost of the receipts.")
+    average: float = Field(..., description="The average receipt total.")
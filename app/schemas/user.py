@@ -1,6 +1,5 @@
 from pydantic import BaseModel, EmailStr
 from typing import List, Optional
-from app.utils import get_password_hash
 
 
 class UserCreate(BaseModel):
@@ -8,9 +7,9 @@ class UserCreate(BaseModel):
     email: EmailStr
     password: str
 
-    def to_dict(self):
-        data = self.model_dump()
-        data["hashed_password"] = get_password_hash(data.pop("password"))
+    def to_dict(self, hashed_password: str):
+        data = self.model_dump(exclude={"password"})
+        data["hashed_password"] = hashed_password
         return data
 
 
@@ -19,10 +18,10 @@ class UserUpdate(BaseModel):
     email: Optional[EmailStr] = None
     password: Optional[str] = None
 
-    def to_dict(self):
-        data = self.model_dump(exclude_none=True)
-        if data.get("password", None):
-            data["hashed_password"] = get_password_hash(data.pop("password"))
+    def to_dict(self, hashed_password: Optional[str] = None):
+        data = self.model_dump(exclude_none=True, exclude={"password"})
+        if hashed_password:
+            data["hashed_password"] = hashed_password
         return data
 
 
@@ -0,0 +1,4 @@
+#!/bin/bash
+
+# Move receipts of old months to the archive, e.g. --before 2024-01-01
+docker compose exec app python -m app.archive "$@"
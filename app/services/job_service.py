@@ -0,0 +1,226 @@
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
+from fastapi import HTTPException
+from app.config import settings
+from app.models.job import Job as JobModel
+from app.schemas.job import JobCreate, ReceiptExport
+from app.schemas.receipt import ReceiptTextBatch
+from app.enums.export_format import TextBatchFormat
+from app.enums.job_kind import JobKind
+from app.enums.job_status import JobStatus
+from app.services.base_service import BaseService
+from app.services.receipt_service import (
+    EXPORT_MEDIA_TYPES,
+    TEXT_BATCH_MEDIA_TYPES,
+    ReceiptService,
+)
+from app.exceptions import EntityNotFoundException
+from typing import AsyncIterator, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class JobService(BaseService):
+    def __init__(self, db: AsyncSession):
+        super().__init__(db, JobModel)
+
+    async def create(self, job_create: JobCreate, owner_id: int) -> JobModel:
+        """Store a pending job, committed so that a worker can pick it up."""
+        job = JobModel(
+            id=uuid.uuid4().hex,
+            kind=job_create.kind,
+            status=JobStatus.PENDING,
+            params=job_create.params,
+            owner_id=owner_id,
+            created_at=datetime.utcnow(),
+        )
+        self.db.add(job)
+        await self.db.commit()
+        return job
+
+    async def get_job(self, job_id: str, owner_id: int, options=None) -> JobModel:
+        job = await self.get_entity_or_404(self.model, job_id, options=options)
+
+        if job.owner_id != owner_id:
+            raise HTTPException(status_code=403, detail="Access forbidden")
+
+        return job
+
+    async def get_result(self, job_id: str, owner_id: int) -> JobModel:
+        """Get a finished job whose result can be downloaded.
+
+        Results are kept in files; jobs that finished before that keep theirs
+        in the `result` column, which is loaded.
+        """
+        job = await self.get_job(job_id, owner_id, options=[undefer(JobModel.result)])
+
+        if job.status != JobStatus.SUCCEEDED:
+            raise HTTPException(status_code=409, detail=f"Job is {job.status.value}")
+        if job.result_file is not None:
+            if not os.path.exists(self.result_path(job.result_file)):
+                raise EntityNotFoundException("Job result")
+        elif job.result is None:
+            raise EntityNotFoundException("Job result")
+
+        return job
+
+    async def get_runnable_ids(self) -> List[str]:
+        """Get the ids of pending jobs and of running jobs that were lost, oldest first."""
+        result = await self.db.execute(
+            select(JobModel.id)
+            .where(self._runnable(datetime.utcnow()))
+            .order_by(JobModel.created_at)
+        )
+        return result.scalars().all()
+
+    async def run(self, job_id: str):
+        """Run a pending job and store its result or its error.
+
+        The job is claimed by moving it to running in one statement, so a job
+        delivered twice is only run once. A job still running after
+        JOB_VISIBILITY_TIMEOUT seconds is taken as lost with its worker and
+        can be claimed again; a run that was superseded this way does not
+        store its outcome.
+        """
+        started_at = datetime.utcnow()
+        claimed = await self.db.execute(
+            update(JobModel)
+            .where(JobModel.id == job_id, self._runnable(started_at))
+            .values(status=JobStatus.RUNNING, started_at=started_at)
+        )
+        await self.db.commit()
+        if claimed.rowcount == 0:
+            return
+
+        job = await self.get_entity_or_404(self.model, job_id)
+        result_file = None
+        try:
+            result = await self._execute(job)
+            if result is not None:
+                chunks, media_type, filename = result
+                result_file = await self._write_result(job_id, chunks)
+        except Exception as ex:
+            logger.exception("Job %s failed", job_id)
+            await self.db.rollback()
+            values = {"status": JobStatus.FAILED, "error": str(ex) or type(ex).__name__}
+        else:
+            values = {"status": JobStatus.SUCCEEDED}
+            if result is not None:
+                values.update(
+                    result_file=result_file,
+                    result_media_type=media_type,
+                    result_filename=filename,
+                )
+
+        finished = await self.db.execute(
+            update(JobModel)
+            .where(JobModel.id == job_id, JobModel.started_at == started_at)
+            .values(finished_at=datetime.utcnow(), **values)
+        )
+        await self.db.commit()
+        if finished.rowcount == 0 and result_file is not None:
+            os.remove(self.result_path(result_file))
+
+    @staticmethod
+    def result_path(result_file: str) -> str:
+        return os.path.join(settings.JOB_RESULT_DIR, result_file)
+
+    async def _write_result(self, job_id: str, chunks: AsyncIterator[bytes]) -> str:
+        """Write a job result to a new file, chunk by chunk, and return its name.
+
+        A result larger than JOB_RESULT_MAX_BYTES fails the job, so that a huge
+        export cannot fill the disk.
+        """
+        os.makedirs(settings.JOB_RESULT_DIR, exist_ok=True)
+        # Named per run, so a run superseded after the visibility timeout
+        # never writes to the file of the run that replaced it.
+        result_file = f"{job_id}-{uuid.uuid4().hex}"
+        path = self.result_path(result_file)
+        size = 0
+        try:
+            with open(path, "wb") as file:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if size > settings.JOB_RESULT_MAX_BYTES:
+                        raise ValueError(
+                            f"The result is larger than {settings.JOB_RESULT_MAX_BYTES} "
+                            "bytes; narrow down the job parameters"
+                        )
+                    file.write(chunk)
+        except BaseException:
+            os.remove(path)
+            raise
+        return result_file
+
+    @staticmethod
+    def _runnable(now: datetime):
+        """Filter jobs that are pending or were started before the visibility timeout."""
+        return or_(
+            JobModel.status == JobStatus.PENDING,
+            and_(
+                JobModel.status == JobStatus.RUNNING,
+                JobModel.started_at
+                < now - timedelta(seconds=settings.JOB_VISIBILITY_TIMEOUT),
+            ),
+        )
+
+    async def _execute(
+        self, job: JobModel
+    ) -> Optional[Tuple[AsyncIterator[bytes], str, str]]:
+        """Do the work of a job with the receipt service.
+
+        Returns the content chunks, media type and file name of the result,
+        if any. The chunks are produced while the result is written, so the
+        result is never held in memory as a whole.
+        """
+        receipt_service = ReceiptService(self.db)
+
+        if job.kind == JobKind.EXPORT:
+            params = ReceiptExport.model_validate(job.params)
+            chunks = receipt_service.export(
+                params.format,
+                job.owner_id,
+                params.start_date,
+                params.end_date,
+                params.min_total,
+                params.max_total,
+                params.payment_type,
+            )
+            return (
+                _encoded(chunks),
+                EXPORT_MEDIA_TYPES[params.format],
+                f"receipts.{params.format.value}",
+            )
+
+        if job.kind == JobKind.REPRINT:
+            params = ReceiptTextBatch.model_validate(job.params)
+            receipts = await receipt_service.get_for_rendering(
+                params.receipt_ids, job.owner_id
+            )
+            chunks = receipt_service.render_batch(
+                receipts, params.line_length, params.format
+            )
+            extension = "zip" if params.format == TextBatchFormat.ZIP else "txt"
+            return (
+                _iterate(chunks),
+                TEXT_BATCH_MEDIA_TYPES[params.format],
+                f"receipts.{extension}",
+            )
+
+        await receipt_service.rebuild_stats(job.owner_id)
+        return None
+
+
+async def _encoded(chunks: AsyncIterator[str]) -> AsyncIterator[bytes]:
+    async for chunk in chunks:
+        yield chunk.encode()
+
+
+async def _iterate(chunks: Iterable[bytes]) -> AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield chunk
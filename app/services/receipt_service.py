@@ -1,14 +1,69 @@
-from datetime import datetime
+import csv
+import io
+import json
+from collections import defaultdict
+from datetime import date, datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import Date, DateTime, cast, delete, exists, func, insert, literal, or_, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from pydantic import ValidationError
 from app.models.receipt import Receipt as ReceiptModel
 from app.models.receipt_item import ReceiptItem
-from app.schemas.receipt import ReceiptCreate, Product, Receipt
+from app.models.receipt_stats import ReceiptDailyStats
+from app.schemas.receipt import ReceiptCreate, Receipt
 from app.enums.receipt_payment import PaymentType
+from app.enums.sort_order import SortOrder
+from app.enums.export_format import ExportFormat, TextBatchFormat
+from app.enums.stats_period import StatsPeriod
+from app.enums.search_mode import SearchMode
 from app.services.base_service import BaseService
-from typing import List, Optional
-from sqlalchemy.orm import selectinload
+from app.archive import archive_reader
+from app.cache import create_cache
+from app.config import settings
+from app.money import format_minor, from_minor, to_minor
+from app.utils import zip_stream
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
+from sqlalchemy.orm import joinedload, selectinload
 from fastapi import HTTPException
+from app.exceptions import EntityNotFoundException
+
+
+EXPORT_BATCH_SIZE = 1000
+
+# Item rows per multi-row INSERT, largest first. Only these sizes are used, so
+# the prepared statement cache holds at most one INSERT per size; the largest
+# keeps the bind parameters (six per row) well below the PostgreSQL limit.
+INSERT_BATCH_SIZES = tuple(2**n for n in range(10, -1, -1))
+
+EXPORT_CSV_HEADER = [
+    "receipt_id",
+    "created_at",
+    "payment_type",
+    "payment_amount",
+    "total",
+    "rest",
+    "product_name",
+    "product_price",
+    "product_quantity",
+]
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+TEXT_BATCH_MEDIA_TYPES = {
+    TextBatchFormat.TEXT: "text/plain",
+    TextBatchFormat.ZIP: "application/zip",
+}
+
+receipt_text_cache = create_cache(
+    "receipt_text",
+    settings.RECEIPT_TEXT_CACHE_SIZE,
+    settings.RECEIPT_TEXT_CACHE_TTL,
+    settings.CACHE_URL,
+)
 
 
 class ReceiptService(BaseService):
@@ -16,41 +71,182 @@ class ReceiptService(BaseService):
         super().__init__(db, ReceiptModel)
 
     async def create(self, receipt_create: ReceiptCreate, owner_id: int):
-        """Create a new receipt."""
+        """Create a new receipt.
+
+        The receipt is inserted with RETURNING to get its ID and its items
+        follow in one multi-row insert, all committed in a single transaction.
+        """
         receipt_data = receipt_create.prepare_receipt_data(owner_id)
 
-        receipt = self.model(**receipt_data)
-        self.db.add(receipt)
+        (receipt_id,) = await self._insert_receipts([receipt_data])
+        await self._insert_items(
+            self._item_rows(receipt_create, receipt_id, receipt_data["created_at"])
+        )
+        await self._add_to_stats([receipt_data])
         await self.db.commit()
-        await self.db.refresh(receipt)
-
-        for item in receipt_create.products:
-            receipt_item = ReceiptItem(
-                name=item.name,
-                price=item.price,
-                quantity=item.quantity,
-                total=item.price * item.quantity,
-                receipt_id=receipt.id,
+
+        return self._created_receipt(receipt_id, receipt_create, receipt_data)
+
+    async def create_many(self, payloads: List[dict], owner_id: int) -> dict:
+        """Create many receipts in a single transaction.
+
+        Every payload is validated on its own, so an invalid receipt is reported
+        with its validation errors instead of failing the whole batch. Valid
+        receipts and their items are written with multi-row inserts.
+        """
+        results = []
+        valid = []
+        for index, payload in enumerate(payloads):
+            try:
+                receipt_create = ReceiptCreate.model_validate(payload)
+            except ValidationError as e:
+                results.append(
+                    {
+                        "index": index,
+                        "errors": e.errors(
+                            include_url=False, include_context=False, include_input=False
+                        ),
+                    }
+                )
+                continue
+            result = {"index": index}
+            results.append(result)
+            valid.append(
+                (result, receipt_create, receipt_create.prepare_receipt_data(owner_id))
             )
-            self.db.add(receipt_item)
-        await self.db.commit()
 
+        if valid:
+            receipt_ids = await self._insert_receipts(
+                [receipt_data for _, _, receipt_data in valid]
+            )
+            await self._insert_items(
+                [
+                    item
+                    for (_, receipt_create, receipt_data), receipt_id in zip(
+                        valid, receipt_ids
+                    )
+                    for item in self._item_rows(
+                        receipt_create, receipt_id, receipt_data["created_at"]
+                    )
+                ]
+            )
+            await self._add_to_stats([receipt_data for _, _, receipt_data in valid])
+            await self.db.commit()
+
+            for (result, receipt_create, receipt_data), receipt_id in zip(
+                valid, receipt_ids
+            ):
+                result["receipt"] = self._created_receipt(
+                    receipt_id, receipt_create, receipt_data
+                )
+
+        return {
+            "created": len(valid),
+            "failed": len(results) - len(valid),
+            "results": results,
+        }
+
+    async def _insert_receipts(self, rows: List[dict]) -> List[int]:
+        """Insert receipt rows with one statement and return their IDs in order."""
+        result = await self.db.execute(
+            insert(ReceiptModel).returning(
+                ReceiptModel.id, sort_by_parameter_order=True
+            ),
+            rows,
+        )
+        return result.scalars().all()
+
+    async def _insert_items(self, rows: List[dict]):
+        """Insert receipt item rows with multi-row INSERT ... VALUES statements.
+
+        Passing the rows as parameters would run an executemany on asyncpg,
+        one statement per row; the rows are inlined into VALUES instead, split
+        into batches of the fixed INSERT_BATCH_SIZES so that the statement
+        text does not vary with every item count.
+        """
+        start = 0
+        for size in INSERT_BATCH_SIZES:
+            while len(rows) - start >= size:
+                await self.db.execute(
+                    insert(ReceiptItem).values(rows[start : start + size])
+                )
+                start += size
+
+    async def _add_to_stats(self, rows: List[dict]):
+        """Add new receipt rows to the daily stats rollup with one upsert.
+
+        The rows are upserted in key order, so concurrent batches lock the
+        stats rows they share in the same order and cannot deadlock.
+        """
+        stats = defaultdict(lambda: {"receipts_count": 0, "total": 0})
+        for row in rows:
+            key = (row["owner_id"], row["created_at"].date(), row["payment_type"])
+            stats[key]["receipts_count"] += 1
+            stats[key]["total"] += row["total"]
+
+        query = pg_insert(ReceiptDailyStats).values(
+            [
+                {"owner_id": owner_id, "day": day, "payment_type": payment_type, **values}
+                for (owner_id, day, payment_type), values in sorted(
+                    stats.items(), key=lambda stat: (stat[0][0], stat[0][1], stat[0][2].name)
+                )
+            ]
+        )
+        query = query.on_conflict_do_update(
+            index_elements=[
+                ReceiptDailyStats.owner_id,
+                ReceiptDailyStats.day,
+                ReceiptDailyStats.payment_type,
+            ],
+            set_={
+                "receipts_count": ReceiptDailyStats.receipts_count
+                + query.excluded.receipts_count,
+                "total": ReceiptDailyStats.total + query.excluded.total,
+            },
+        )
+        await self.db.execute(query)
+
+    @staticmethod
+    def _item_rows(
+        receipt_create: ReceiptCreate, receipt_id: int, receipt_created_at: datetime
+    ) -> List[dict]:
+        """Build the receipt item rows of a receipt, with amounts in kopecks.
+
+        Items carry the creation time of their receipt, which is the key of
+        the partition they are stored in.
+        """
+        return [
+            {
+                "name": item.name,
+                "price": to_minor(item.price),
+                "quantity": item.quantity,
+                "total": to_minor(item.price) * item.quantity,
+                "receipt_id": receipt_id,
+                "receipt_created_at": receipt_created_at,
+            }
+            for item in receipt_create.products
+        ]
+
+    @staticmethod
+    def _created_receipt(
+        receipt_id: int, receipt_create: ReceiptCreate, receipt_data: dict
+    ) -> dict:
+        """Build the response data of a newly created receipt."""
         return {
-            "id": receipt.id,
+            "id": receipt_id,
             "products": [
                 {
                     "name": item.name,
                     "price": item.price,
                     "quantity": item.quantity,
-                    "total": item.price * item.quantity,
                 }
                 for item in receipt_create.products
             ],
             "payment": receipt_create.payment.model_dump(),
-            "total": receipt_data["total"],
-            "rest": receipt_data["rest"],
+            "total": from_minor(receipt_data["total"]),
+            "rest": from_minor(receipt_data["rest"]),
             "created_at": receipt_data["created_at"],
-            "owner_id": owner_id,
+            "owner_id": receipt_data["owner_id"],
         }
 
     async def get_by_owner(
@@ -63,8 +259,294 @@ class ReceiptService(BaseService):
         payment_type: Optional[PaymentType] = None,
         limit: int = 10,
         offset: int = 0,
-    ) -> List[ReceiptModel]:
-        """Get all receipts belonging to a specific user with optional filters."""
+        cursor: Optional[Tuple[datetime, int]] = None,
+        order: SortOrder = SortOrder.DESC,
+    ) -> List[Receipt]:
+        """Get all receipts belonging to a specific user with optional filters.
+
+        Receipts are ordered by `(created_at, id)`. When a cursor is given the
+        page starts right after that position and the offset is ignored.
+        """
+        query = self._filter_by_owner(
+            owner_id, start_date, end_date, min_total, max_total, payment_type
+        )
+        query = self._order_by_position(query, order, cursor)
+        if cursor is None:
+            query = query.offset(offset)
+
+        query = query.options(selectinload(ReceiptModel.items)).limit(limit)
+        result = await self.db.execute(query)
+        receipts = result.scalars().all()
+
+        return [Receipt.from_orm_trusted(receipt) for receipt in receipts]
+
+    async def get_latest_id(self, owner_id: int) -> Optional[int]:
+        """Get the ID of the newest receipt of a user through the owner index."""
+        query = self._order_by_position(self._filter_by_owner(owner_id), SortOrder.DESC)
+        return await self.db.scalar(query.with_only_columns(ReceiptModel.id).limit(1))
+
+    async def search(
+        self,
+        owner_id: int,
+        q: str,
+        mode: SearchMode = SearchMode.CONTAINS,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        min_total: Optional[float] = None,
+        max_total: Optional[float] = None,
+        payment_type: Optional[PaymentType] = None,
+        limit: int = 10,
+        cursor: Optional[Tuple[datetime, int]] = None,
+        order: SortOrder = SortOrder.DESC,
+    ) -> List[Receipt]:
+        """Get the receipts of a user with a product whose name matches `q`.
+
+        Matching items are found through the trigram index on their names,
+        and receipts are paged by `(created_at, id)` like `get_by_owner`.
+        """
+        query = self._filter_by_owner(
+            owner_id, start_date, end_date, min_total, max_total, payment_type
+        ).filter(
+            exists().where(
+                ReceiptItem.receipt_id == ReceiptModel.id,
+                ReceiptItem.receipt_created_at == ReceiptModel.created_at,
+                self._name_matches(q, mode),
+            )
+        )
+        query = self._order_by_position(query, order, cursor)
+
+        query = query.options(selectinload(ReceiptModel.items)).limit(limit)
+        result = await self.db.execute(query)
+        receipts = result.scalars().all()
+
+        return [Receipt.from_orm_trusted(receipt) for receipt in receipts]
+
+    @staticmethod
+    def _name_matches(q: str, mode: SearchMode):
+        """Build a condition matching item names, case-insensitively.
+
+        `prefix` matches names with a word starting with `q`, `contains` names
+        containing `q` anywhere and `fuzzy` names with a word similar to `q`
+        (pg_trgm `word_similarity_threshold`, 0.6 by default).
+        """
+        if mode == SearchMode.FUZZY:
+            return ReceiptItem.name.op("%>")(q)
+        pattern = q.replace("/", "//").replace("%", "/%").replace("_", "/_")
+        if mode == SearchMode.PREFIX:
+            return or_(
+                ReceiptItem.name.ilike(f"{pattern}%", escape="/"),
+                ReceiptItem.name.ilike(f"% {pattern}%", escape="/"),
+            )
+        return ReceiptItem.name.ilike(f"%{pattern}%", escape="/")
+
+    async def stream_by_owner(
+        self,
+        owner_id: int,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        min_total: Optional[float] = None,
+        max_total: Optional[float] = None,
+        payment_type: Optional[PaymentType] = None,
+    ) -> AsyncIterator[dict]:
+        """Stream the receipts of a user with their products.
+
+        Receipts and items are read by one joined query through a server-side
+        cursor, so memory use does not grow with the number of receipts.
+        """
+        query = (
+            self._filter_by_owner(
+                owner_id, start_date, end_date, min_total, max_total, payment_type
+            )
+            .outerjoin(ReceiptModel.items)
+            .with_only_columns(
+                ReceiptModel.id,
+                ReceiptModel.total,
+                ReceiptModel.rest,
+                ReceiptModel.payment_type,
+                ReceiptModel.payment_amount,
+                ReceiptModel.created_at,
+                ReceiptModel.owner_id,
+                ReceiptItem.name,
+                ReceiptItem.price,
+                ReceiptItem.quantity,
+            )
+            .order_by(ReceiptModel.created_at, ReceiptModel.id, ReceiptItem.id)
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+
+        receipt = None
+        result = await self.db.stream(query)
+        async for row in result:
+            if receipt is None or receipt["id"] != row.id:
+                if receipt is not None:
+                    yield receipt
+                receipt = {
+                    "id": row.id,
+                    "products": [],
+                    "payment": {
+                        "type": row.payment_type.value,
+                        "amount": from_minor(row.payment_amount),
+                    },
+                    "total": from_minor(row.total),
+                    "rest": from_minor(row.rest),
+                    "created_at": row.created_at.isoformat(),
+                    "owner_id": row.owner_id,
+                }
+            if row.name is not None:
+                receipt["products"].append(
+                    {"name": row.name, "price": from_minor(row.price), "quantity": row.quantity}
+                )
+        if receipt is not None:
+            yield receipt
+
+    async def export(
+        self,
+        export_format: ExportFormat,
+        owner_id: int,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        min_total: Optional[float] = None,
+        max_total: Optional[float] = None,
+        payment_type: Optional[PaymentType] = None,
+    ) -> AsyncIterator[str]:
+        """Stream the receipts of a user as NDJSON or CSV text chunks."""
+        receipts = self.stream_by_owner(
+            owner_id, start_date, end_date, min_total, max_total, payment_type
+        )
+        if export_format == ExportFormat.CSV:
+            lines = self._csv_lines(receipts)
+        else:
+            lines = self._ndjson_lines(receipts)
+
+        chunk = []
+        async for line in lines:
+            chunk.append(line)
+            if len(chunk) >= EXPORT_BATCH_SIZE:
+                yield "".join(chunk)
+                chunk = []
+        if chunk:
+            yield "".join(chunk)
+
+    @staticmethod
+    async def _ndjson_lines(receipts: AsyncIterator[dict]) -> AsyncIterator[str]:
+        """Format receipts as JSON lines."""
+        async for receipt in receipts:
+            yield json.dumps(receipt, ensure_ascii=False) + "\n"
+
+    @staticmethod
+    async def _csv_lines(receipts: AsyncIterator[dict]) -> AsyncIterator[str]:
+        """Format receipts as CSV with one row per product."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_CSV_HEADER)
+        async for receipt in receipts:
+            for product in receipt["products"] or [{}]:
+                writer.writerow(
+                    [
+                        receipt["id"],
+                        receipt["created_at"],
+                        receipt["payment"]["type"],
+                        receipt["payment"]["amount"],
+                        receipt["total"],
+                        receipt["rest"],
+                        product.get("name", ""),
+                        product.get("price", ""),
+                        product.get("quantity", ""),
+                    ]
+                )
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    async def get_stats(
+        self,
+        owner_id: int,
+        group_by: StatsPeriod = StatsPeriod.DAY,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        payment_type: Optional[PaymentType] = None,
+    ) -> List[dict]:
+        """Get receipt totals of a user grouped by period and payment type.
+
+        Stats are aggregated from the daily rollup instead of the receipts, so
+        the cost depends on the number of days, not on the number of receipts.
+        """
+        period = cast(
+            func.date_trunc(
+                literal(group_by.value, literal_execute=True),
+                cast(ReceiptDailyStats.day, DateTime),
+            ),
+            Date,
+        )
+        query = select(
+            period.label("period"),
+            ReceiptDailyStats.payment_type,
+            func.sum(ReceiptDailyStats.receipts_count).label("count"),
+            func.sum(ReceiptDailyStats.total).label("total"),
+        ).filter(ReceiptDailyStats.owner_id == owner_id)
+
+        if start_date:
+            query = query.filter(ReceiptDailyStats.day >= start_date)
+        if end_date:
+            query = query.filter(ReceiptDailyStats.day <= end_date)
+        if payment_type:
+            query = query.filter(ReceiptDailyStats.payment_type == payment_type)
+
+        query = query.group_by(period, ReceiptDailyStats.payment_type).order_by(
+            period, ReceiptDailyStats.payment_type
+        )
+        result = await self.db.execute(query)
+
+        return [
+            {
+                "period": row.period,
+                "payment_type": row.payment_type,
+                "count": row.count,
+                "total": from_minor(int(row.total)),
+                "average": from_minor(int(row.total)) / row.count if row.count else 0.0,
+            }
+            for row in result
+        ]
+
+    async def rebuild_stats(self, owner_id: Optional[int] = None):
+        """Recompute the daily stats rollup from the receipts.
+
+        Rebuilds the rollup of one user, or of every user if no owner is given.
+        """
+        day = cast(ReceiptModel.created_at, Date)
+        receipts = select(
+            ReceiptModel.owner_id,
+            day,
+            ReceiptModel.payment_type,
+            func.count(),
+            func.sum(ReceiptModel.total),
+        ).group_by(ReceiptModel.owner_id, day, ReceiptModel.payment_type)
+        stats = delete(ReceiptDailyStats)
+
+        if owner_id is not None:
+            receipts = receipts.filter(ReceiptModel.owner_id == owner_id)
+            stats = stats.filter(ReceiptDailyStats.owner_id == owner_id)
+
+        await self.db.execute(stats)
+        await self.db.execute(
+            insert(ReceiptDailyStats).from_select(
+                ["owner_id", "day", "payment_type", "receipts_count", "total"], receipts
+            )
+        )
+        await self.db.commit()
+
+    @staticmethod
+    def _filter_by_owner(
+        owner_id: int,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        min_total: Optional[float] = None,
+        max_total: Optional[float] = None,
+        payment_type: Optional[PaymentType] = None,
+    ):
+        """Build a query for the receipts of a user with optional filters."""
         query = select(ReceiptModel).filter(ReceiptModel.owner_id == owner_id)
 
         if start_date:
@@ -72,40 +554,95 @@ class ReceiptService(BaseService):
         if end_date:
             query = query.filter(ReceiptModel.created_at <= end_date)
         if min_total:
-            query = query.filter(ReceiptModel.total >= min_total)
+            query = query.filter(ReceiptModel.total >= to_minor(min_total))
         if max_total:
-            query = query.filter(ReceiptModel.total <= max_total)
+            query = query.filter(ReceiptModel.total <= to_minor(max_total))
         if payment_type:
             query = query.filter(ReceiptModel.payment_type == payment_type)
 
-        query = query.offset(offset).limit(limit)
-        result = await self.db.execute(query)
-        receipts = result.scalars().all()
+        return query
 
-        receipts_with_items = []
-        for receipt in receipts:
-            items_query = select(ReceiptItem).filter(
-                ReceiptItem.receipt_id == receipt.id
-            )
-            items_result = await self.db.execute(items_query)
-            items = items_result.scalars().all()
+    @staticmethod
+    def _order_by_position(
+        query, order: SortOrder, cursor: Optional[Tuple[datetime, int]] = None
+    ):
+        """Order a receipt query by `(created_at, id)` and seek past the cursor."""
+        position = tuple_(ReceiptModel.created_at, ReceiptModel.id)
+        if order == SortOrder.ASC:
+            query = query.order_by(ReceiptModel.created_at.asc(), ReceiptModel.id.asc())
+            if cursor:
+                query = query.filter(position > tuple_(*cursor))
+        else:
+            query = query.order_by(ReceiptModel.created_at.desc(), ReceiptModel.id.desc())
+            if cursor:
+                query = query.filter(position < tuple_(*cursor))
+        return query
 
-            products = [
-                Product(name=item.name, price=float(item.price), quantity=item.quantity)
-                for item in items
-            ]
+    async def get_receipt_text(self, receipt_id: int, line_length: int = 40) -> str:
+        """Generate a text representation of the receipt.
 
-            receipt_schema = Receipt.from_orm_with_items(receipt, products)
-            receipts_with_items.append(receipt_schema)
+        Receipts never change once created, so rendered texts are cached by
+        `(receipt_id, line_length)` and reprints do not touch the database.
+        """
+        key = (receipt_id, line_length)
+        receipt_text = await receipt_text_cache.get(key)
+        if receipt_text is None:
+            receipt = await self._get_with_items(receipt_id)
+            receipt_text = self.render_text(receipt, line_length)
+            await receipt_text_cache.set(key, receipt_text)
+        return receipt_text
 
-        return receipts_with_items
+    async def get_for_rendering(
+        self, receipt_ids: List[int], owner_id: int
+    ) -> List[ReceiptModel]:
+        """Load receipts of a user with their items in one query.
 
-    async def get_receipt_text(self, receipt_id: int, line_length: int = 40) -> str:
-        """Generate a text representation of the receipt."""
-        receipt = await self.get_entity_or_404(
-            self.model, receipt_id, options=[selectinload(self.model.items)]
+        Receipts are returned in the requested order; a 404 is raised if any
+        of them does not exist or belongs to another user.
+        """
+        receipt_ids = list(dict.fromkeys(receipt_ids))
+        query = (
+            select(ReceiptModel)
+            .options(joinedload(ReceiptModel.items))
+            .filter(ReceiptModel.id.in_(receipt_ids))
+            .filter(ReceiptModel.owner_id == owner_id)
+        )
+        result = await self.db.execute(query)
+        receipts = {receipt.id: receipt for receipt in result.unique().scalars()}
+
+        if len(receipts) != len(receipt_ids):
+            raise EntityNotFoundException(self.model.__name__)
+        return [receipts[receipt_id] for receipt_id in receipt_ids]
+
+    @staticmethod
+    async def invalidate_receipt_text(receipt_id: int):
+        """Drop the cached texts of a receipt for every line length."""
+        await receipt_text_cache.delete_prefix((receipt_id,))
+
+    @classmethod
+    def render_batch(
+        cls,
+        receipts: List[ReceiptModel],
+        line_length: int,
+        batch_format: TextBatchFormat = TextBatchFormat.TEXT,
+    ) -> Iterator[bytes]:
+        """Render receipts as one text stream or as a ZIP with a file per receipt."""
+        if batch_format == TextBatchFormat.ZIP:
+            return zip_stream(
+                (
+                    f"receipt_{receipt.id}.txt",
+                    cls.render_text(receipt, line_length).encode(),
+                )
+                for receipt in receipts
+            )
+        return (
+            (cls.render_text(receipt, line_length) + "\n\n").encode()
+            for receipt in receipts
         )
 
+    @staticmethod
+    def render_text(receipt: ReceiptModel, line_length: int = 40) -> str:
+        """Lay out a receipt loaded with its items as fixed-width text."""
         items = receipt.items
 
         lines = []
@@ -113,8 +650,8 @@ class ReceiptService(BaseService):
         lines.append("=" * line_length)
 
         for item in items:
-            price_formatted = f"{item.price:,.2f}".replace(",", " ")
-            total_formatted = f"{item.total:,.2f}".replace(",", " ")
+            price_formatted = format_minor(item.price)
+            total_formatted = format_minor(item.total)
 
             lines.append(
                 f"{item.quantity} x {price_formatted} {total_formatted.rjust(line_length - len(f'{item.quantity} x {price_formatted} '))}"
@@ -124,9 +661,9 @@ class ReceiptService(BaseService):
 
         lines.append("=" * line_length)
 
-        total_formatted = f"{receipt.total:,.2f}".replace(",", " ")
-        payment_amount_formatted = f"{receipt.payment_amount:,.2f}".replace(",", " ")
-        rest_formatted = f"{receipt.rest:,.2f}".replace(",", " ")
+        total_formatted = format_minor(receipt.total)
+        payment_amount_formatted = format_minor(receipt.payment_amount)
+        rest_formatted = format_minor(receipt.rest)
 
         payment_type_translation = {
             "cash": "Готівка",
@@ -150,17 +687,21 @@ class ReceiptService(BaseService):
         return "\n".join(lines)
 
     async def get_receipt(self, receipt_id: int, owner_id: int) -> Receipt:
-        receipt = await self.get_entity_or_404(
-            self.model, receipt_id, options=[selectinload(self.model.items)]
-        )
+        receipt = await self._get_with_items(receipt_id)
 
         if receipt.owner_id != owner_id:
             raise HTTPException(status_code=403, detail="Access forbidden")
 
-        products = [
-            Product(name=item.name, price=float(item.price), quantity=item.quantity)
-            for item in receipt.items
-        ]
+        return Receipt.from_orm_trusted(receipt)
 
-        receipt_schema = Receipt.from_orm_with_items(receipt, products)
-        return receipt_schema
+    async def _get_with_items(self, receipt_id: int) -> ReceiptModel:
+        """Load a receipt with its items, from the archive if it was moved there."""
+        try:
+            return await self.get_entity_or_404(
+                self.model, receipt_id, options=[selectinload(self.model.items)]
+            )
+        except EntityNotFoundException:
+            receipt = archive_reader.get(receipt_id)
+            if receipt is None:
+                raise
+            return receipt
@@ -2,11 +2,18 @@ from app.models.user import User
 from app.services.base_service import BaseService
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from app.schemas.user import UserCreate, UserUpdate
+from app.schemas.user import UserCreate, UserUpdate, User as UserSchema
 from fastapi import HTTPException
 from sqlalchemy.exc import IntegrityError
-from app.utils import verify_password
+from app.utils import password_hasher
 from sqlalchemy.orm import selectinload
+from app.cache import create_cache
+from app.config import settings
+
+
+user_cache = create_cache(
+    "users", settings.AUTH_CACHE_SIZE, settings.AUTH_CACHE_TTL, settings.CACHE_URL
+)
 
 
 class UserService(BaseService):
@@ -15,7 +22,8 @@ class UserService(BaseService):
 
     async def create(self, user: UserCreate):
         """Create a new user."""
-        user = User(**user.to_dict())
+        hashed_password = await password_hasher.hash(user.password)
+        user = User(**user.to_dict(hashed_password))
         self.db.add(user)
         try:
             await self.db.commit()
@@ -30,21 +38,34 @@ class UserService(BaseService):
     async def update(self, id, user_update: UserUpdate):
         """Update a user."""
         entity = await self.get_entity_or_404(self.model, id)
-        update_data = user_update.to_dict()
+        hashed_password = None
+        if user_update.password:
+            hashed_password = await password_hasher.hash(user_update.password)
+        update_data = user_update.to_dict(hashed_password)
 
         for key, value in update_data.items():
             setattr(entity, key, value)
 
         await self.db.commit()
         await self.db.refresh(entity)
+        await user_cache.delete((id,))
         return entity
 
+    async def get_cached(self, id: int) -> UserSchema:
+        """Get a user by ID, served from the user cache when possible."""
+        user = await user_cache.get((id,))
+        if user is None:
+            entity = await self.get(id)
+            user = UserSchema.model_validate(entity).model_dump()
+            await user_cache.set((id,), user)
+        return UserSchema(**user)
+
     async def authenticate_user(self, db: AsyncSession, username: str, password: str):
         """Authenticate a user by username and password."""
         query = select(User).filter(User.username == username)
         user = await db.execute(query)
         user = user.scalars().first()
-        if not user or not verify_password(password, user.hashed_password):
+        if not user or not await password_hasher.verify(password, user.hashed_password):
             raise HTTPException(
                 status_code=400, detail="Incorrect username or password"
             )
@@ -1,6 +1,15 @@
 from passlib.context import CryptContext
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, Iterable, Iterator, Optional, Tuple
+import asyncio
+import base64
+import hashlib
+import hmac
+import io
+import json
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 import jwt
 from jwt.exceptions import InvalidTokenError
 from fastapi import HTTPException, status
@@ -42,3 +51,139 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+
+class PasswordHasher:
+    def __init__(self, workers: int, max_pending: int):
+        """
+        Runs bcrypt hashing and verification in a bounded thread pool.
+        bcrypt releases the GIL, so the event loop keeps serving other
+        requests while passwords are being hashed.
+        Attributes:
+            workers (int): Number of hashing threads.
+            max_pending (int): Maximum number of running and queued calls.
+        """
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.seconds = 0.0
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="password-hasher"
+        )
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def _run(self, func, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Too many authentication requests",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+            self.seconds += time.perf_counter() - started
+
+    def stats(self) -> dict:
+        """Return the pool counters."""
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "seconds": self.seconds,
+        }
+
+
+password_hasher = PasswordHasher(
+    settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING
+)
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    """Encode a keyset pagination position into an opaque cursor."""
+    raw = json.dumps([created_at.isoformat(), id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by `encode_cursor`."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+# Part of every entity tag; bump it when the JSON or text of receipts changes
+# so that tags held by clients stop matching.
+ETAG_VERSION = 1
+
+
+def make_etag(*parts: Any, weak: bool = False) -> str:
+    """Build an entity tag from the values identifying a representation.
+
+    Tags are keyed with the secret key, so a client only holds the tag of a
+    representation it was sent.
+    """
+    message = "|".join(map(str, (ETAG_VERSION, *parts))).encode()
+    digest = hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+    return f'W/"{digest[:32]}"' if weak else f'"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str, exists: bool = True) -> bool:
+    """Check an If-None-Match header against an entity tag, ignoring weakness.
+
+    `*` matches any representation, so it only matches while `exists` is set;
+    pass False to check a resource that has not been looked up yet.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return exists
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in tags
+
+
+class _ChunkWriter(io.RawIOBase):
+    """Write-only, unseekable file that hands out what was written so far."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def zip_stream(files: Iterable[Tuple[str, bytes]]) -> Iterator[bytes]:
+    """Build a ZIP archive incrementally, yielding bytes after every file."""
+    writer = _ChunkWriter()
+    with zipfile.ZipFile(writer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in files:
+            archive.writestr(name, data)
+            yield writer.take()
+    yield writer.take()
@@ -0,0 +1,98 @@
+import json
+import os
+import timeit
+from datetime import datetime
+from pathlib import Path
+import pytest
+from app.enums.receipt_payment import PaymentType
+from app.models.receipt import Receipt as ReceiptModel
+from app.models.receipt_item import ReceiptItem
+
+BASELINES_PATH = Path(__file__).with_name("baselines.json")
+
+# A benchmark fails when it is this many times slower than its baseline.
+THRESHOLD = float(os.environ.get("BENCHMARK_THRESHOLD", "1.5"))
+
+# Set BENCHMARK_UPDATE=1 to store the current results as the new baselines.
+UPDATE = os.environ.get("BENCHMARK_UPDATE") == "1"
+
+results = {}
+
+
+@pytest.fixture(scope="session", autouse=True)
+def setup_test_database():
+    """
+    Benchmarks run without Postgres, so the test database is not created.
+    """
+    yield
+
+
+@pytest.fixture(autouse=True)
+def clean_db():
+    """
+    Benchmarks do not touch the database.
+    """
+    yield
+
+
+@pytest.fixture(scope="session")
+def baselines():
+    """
+    Loads the stored baselines and saves new ones after the session if requested.
+    """
+    stored = json.loads(BASELINES_PATH.read_text()) if BASELINES_PATH.exists() else {}
+    yield stored
+    if UPDATE:
+        BASELINES_PATH.write_text(json.dumps({**stored, **results}, indent=2, sort_keys=True) + "\n")
+
+
+@pytest.fixture
+def benchmark(request, baselines):
+    """
+    Times a callable and compares the best time per call with its baseline.
+    """
+
+    def run(func, *args, **kwargs):
+        timer = timeit.Timer(lambda: func(*args, **kwargs))
+        number, _ = timer.autorange()
+        seconds = min(timer.repeat(repeat=5, number=number)) / number
+        results[request.node.name] = {"seconds": seconds}
+
+        baseline = baselines.get(request.node.name)
+        if baseline and not UPDATE:
+            assert seconds <= baseline["seconds"] * THRESHOLD, (
+                f"{request.node.name} took {seconds * 1e6:.1f} us per call, "
+                f"baseline is {baseline['seconds'] * 1e6:.1f} us"
+            )
+        return seconds
+
+    return run
+
+
+def make_receipt_payload(products: int) -> dict:
+    """Build a valid receipt payload with the given number of products."""
+    return {
+        "products": [
+            {"name": f"Product {i}", "price": 12.35, "quantity": 2}
+            for i in range(products)
+        ],
+        "payment": {"type": "cash", "amount": 24.70 * products + 10},
+    }
+
+
+def make_receipt_row(products: int) -> ReceiptModel:
+    """Build a stored receipt with its items in memory, as loaded by the ORM."""
+    total = 2470 * products
+    return ReceiptModel(
+        id=1,
+        total=total,
+        rest=1000,
+        payment_type=PaymentType.CASH,
+        payment_amount=total + 1000,
+        created_at=datetime(2026, 1, 1, 12, 30),
+        owner_id=1,
+        items=[
+            ReceiptItem(name=f"Product {i}", price=1235, quantity=2, total=2470)
+            for i in range(products)
+        ],
+    )
@@ -0,0 +1,69 @@
+import pytest
+from app.schemas.receipt import Product, Receipt, ReceiptCreate
+from app.services.receipt_service import ReceiptService
+from app.money import from_minor
+from app.utils import create_access_token, decode_access_token
+from tests.benchmarks.conftest import make_receipt_payload, make_receipt_row
+
+pytestmark = pytest.mark.benchmark
+
+SIZES = [1, 100, 10000]
+
+
+@pytest.mark.parametrize("products", SIZES)
+def test_receipt_create_validation(benchmark, products):
+    """Benchmark validating a receipt payload."""
+    payload = make_receipt_payload(products)
+
+    benchmark(ReceiptCreate.model_validate, payload)
+
+
+@pytest.mark.parametrize("products", SIZES)
+def test_prepare_receipt_data(benchmark, products):
+    """Benchmark preparing the receipt row of a validated receipt."""
+    receipt_create = ReceiptCreate.model_validate(make_receipt_payload(products))
+
+    benchmark(receipt_create.prepare_receipt_data, 1)
+
+
+@pytest.mark.parametrize("products", [1, 100])
+def test_receipt_from_orm_with_items(benchmark, products):
+    """Benchmark building a validated Receipt schema from a stored row."""
+    receipt = make_receipt_row(products)
+
+    def build():
+        products = [
+            Product(name=item.name, price=from_minor(item.price), quantity=item.quantity)
+            for item in receipt.items
+        ]
+        return Receipt.from_orm_with_items(receipt, products)
+
+    benchmark(build)
+
+
+@pytest.mark.parametrize("products", [1, 100])
+def test_receipt_from_orm_trusted(benchmark, products):
+    """Benchmark building a Receipt schema from a stored row without validation."""
+    receipt = make_receipt_row(products)
+
+    benchmark(Receipt.from_orm_trusted, receipt)
+
+
+@pytest.mark.parametrize("products", [1, 100])
+def test_render_receipt_text(benchmark, products):
+    """Benchmark the text layout of a receipt."""
+    receipt = make_receipt_row(products)
+
+    benchmark(ReceiptService.render_text, receipt, 40)
+
+
+def test_create_access_token(benchmark):
+    """Benchmark issuing an access token."""
+    benchmark(create_access_token, {"sub": "1"})
+
+
+def test_decode_access_token(benchmark):
+    """Benchmark decoding an access token."""
+    token = create_access_token({"sub": "1"})
+
+    benchmark(decode_access_token, token)
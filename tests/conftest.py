@@ -1,12 +1,21 @@
+import pytest
 import pytest_asyncio
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from app.database import Base, get_db
+from app.database import (
+    Base,
+    get_db,
+    get_read_db,
+    get_read_session_factory,
+    get_session_factory,
+)
 from app.main import app
 from app.config import settings
+from app.cache import caches
+from app.metrics import instrument_engine
 from httpx import ASGITransport, AsyncClient
 from sqlalchemy.pool import NullPool
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.sql import text
 
 # Create a synchronous engine for database management (PostgreSQL requires synchronous CREATE DATABASE commands)
@@ -18,10 +27,15 @@ admin_engine = create_engine(
 engine = create_async_engine(
     str(settings.TEST_SQLALCHEMY_DATABASE_URL), echo=True, poolclass=NullPool
 )
+instrument_engine(engine.sync_engine)
 
 # Session for tests
 TestingSessionLocal = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
 
+# Internal endpoints are closed without a token; the test client sends this one.
+INTERNAL_API_TOKEN = "test-internal-token"
+settings.INTERNAL_API_TOKEN = INTERNAL_API_TOKEN
+
 
 def create_test_database():
     """Creates a test database if it does not exist."""
@@ -54,12 +68,14 @@ async def setup_test_database():
 @pytest_asyncio.fixture(scope="function", autouse=True)
 async def clean_db(db: AsyncSession):
     """
-    Cleans the database before each test.
+    Cleans the database and the caches before each test.
     """
-    tables = ["users", "receipts", "receipt_items"]
+    tables = ["users", "receipts", "receipt_items", "receipt_daily_stats", "jobs"]
     for table in tables:
         await db.execute(text(f"TRUNCATE {table} RESTART IDENTITY CASCADE;"))
     await db.commit()
+    for cache in caches.values():
+        await cache.clear()
 
 
 @pytest_asyncio.fixture
@@ -82,8 +98,28 @@ async def client(db: AsyncSession):
         yield db
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: TestingSessionLocal
+    app.dependency_overrides[get_read_session_factory] = lambda: TestingSessionLocal
     async with AsyncClient(
-        transport=ASGITransport(app=app), base_url="http://test"
+        transport=ASGITransport(app=app),
+        base_url="http://test",
+        headers={"X-Internal-Token": INTERNAL_API_TOKEN},
     ) as c:
         yield c
     app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def query_counter():
+    """
+    Collects the SQL statements executed against the test database.
+    """
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
@@ -1,5 +1,21 @@
+import asyncio
 import pytest
 import uuid
+import json
+import io
+import zipfile
+from datetime import datetime, timedelta
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import update
+from app import database
+from app.config import settings
+from app.enums.job_status import JobStatus
+from app.jobs.broker import broker
+from app.main import app
+from app.models.job import Job as JobModel
+from app.profiling import ProfilingMiddleware
+from app.services.job_service import JobService
+from tests.conftest import TestingSessionLocal
 
 @pytest.mark.asyncio
 async def test_register_and_login(client):
@@ -177,3 +193,627 @@ async def test_invalid_login(client):
         data={"username": "wronguser", "password": "wrongpassword"},
     )
     assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_create_receipts_batch(client):
+    """Test creating receipts in a batch with one invalid receipt."""
+    token, _ = await test_register_and_login(client)
+
+    response = await client.post(
+        "/receipts/batch",
+        json={
+            "receipts": [
+                {
+                    "products": [{"name": "Bread", "price": 30.00, "quantity": 2}],
+                    "payment": {"type": "cash", "amount": 100.00},
+                },
+                {
+                    "products": [{"name": "Milk", "price": 50.00, "quantity": 1}],
+                    "payment": {"type": "cash", "amount": 10.00},
+                },
+                {
+                    "products": [{"name": "Cheese", "price": 120.00, "quantity": 1}],
+                    "payment": {"type": "cashless", "amount": 120.00},
+                },
+            ]
+        },
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 200
+    batch = response.json()
+    assert batch["created"] == 2
+    assert batch["failed"] == 1
+    assert [result["index"] for result in batch["results"]] == [0, 1, 2]
+    assert batch["results"][1]["receipt"] is None
+    assert batch["results"][1]["errors"]
+
+    for result in (batch["results"][0], batch["results"][2]):
+        receipt_id = result["receipt"]["id"]
+        get_response = await client.get(
+            f"/receipts/{receipt_id}", headers={"Authorization": f"Bearer {token}"}
+        )
+        assert get_response.status_code == 200
+        assert len(get_response.json()["products"]) == 1
+
+@pytest.mark.asyncio
+async def test_create_receipts_batch_with_out_of_range_amounts(client):
+    """Test that receipts with out-of-range amounts fail alone in a batch."""
+    token, _ = await test_register_and_login(client)
+    valid = {
+        "products": [{"name": "Bread", "price": 30.00, "quantity": 2}],
+        "payment": {"type": "cash", "amount": 100.00},
+    }
+
+    response = await client.post(
+        "/receipts/batch",
+        json={
+            "receipts": [
+                valid,
+                {
+                    "products": [{"name": "Huge", "price": 1e300, "quantity": 1}],
+                    "payment": {"type": "cash", "amount": 1e300},
+                },
+                {
+                    "products": [{"name": "Dust", "price": 0.001, "quantity": 1}],
+                    "payment": {"type": "cash", "amount": 1.00},
+                },
+                valid,
+            ]
+        },
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 200
+    batch = response.json()
+    assert (batch["created"], batch["failed"]) == (2, 2)
+    assert [result["receipt"] is None for result in batch["results"]] == [
+        False,
+        True,
+        True,
+        False,
+    ]
+    assert batch["results"][1]["errors"][0]["loc"] == ["products", 0, "price"]
+    assert batch["results"][2]["errors"][0]["loc"] == ["products", 0, "price"]
+
+@pytest.mark.asyncio
+async def test_get_receipts_query_count_is_constant(client, query_counter):
+    """Test that listing receipts does not issue a query per receipt."""
+    token, _ = await test_register_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    for _ in range(3):
+        response = await client.post(
+            "/receipts/",
+            json={
+                "products": [
+                    {"name": "Bread", "price": 30.00, "quantity": 1},
+                    {"name": "Milk", "price": 40.00, "quantity": 1},
+                ],
+                "payment": {"type": "cash", "amount": 70.00},
+            },
+            headers=headers,
+        )
+        assert response.status_code == 200
+
+    query_counts = []
+    for limit in (1, 3):
+        query_counter.clear()
+        response = await client.get(f"/receipts/?limit={limit}", headers=headers)
+        assert response.status_code == 200
+        assert len(response.json()) == limit
+        query_counts.append(len(query_counter))
+
+    assert query_counts[0] == query_counts[1]
+
+@pytest.mark.asyncio
+async def test_get_receipts_with_cursor(client):
+    """Test paging through receipts with a cursor."""
+    token, _ = await test_register_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    for price in (10.00, 20.00, 30.00):
+        await client.post(
+            "/receipts/",
+            json={
+                "products": [{"name": "Item", "price": price, "quantity": 1}],
+                "payment": {"type": "cash", "amount": 100.00},
+            },
+            headers=headers,
+        )
+
+    first_page = await client.get("/receipts/?limit=2", headers=headers)
+    assert first_page.status_code == 200
+    cursor = first_page.headers["X-Next-Cursor"]
+
+    second_page = await client.get(f"/receipts/?limit=2&cursor={cursor}", headers=headers)
+    assert second_page.status_code == 200
+    assert "X-Next-Cursor" not in second_page.headers
+
+    ids = [receipt["id"] for receipt in first_page.json() + second_page.json()]
+    assert ids == sorted(ids, reverse=True)
+    assert len(set(ids)) == 3
+
+    invalid_response = await client.get("/receipts/?cursor=invalid", headers=headers)
+    assert invalid_response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_export_receipts(client):
+    """Test exporting receipts as NDJSON and CSV."""
+    receipt_id, token = await test_create_receipt(client)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    ndjson_response = await client.get("/receipts/export?format=ndjson", headers=headers)
+    assert ndjson_response.status_code == 200
+    lines = ndjson_response.text.splitlines()
+    assert len(lines) == 1
+    exported = json.loads(lines[0])
+    assert exported["id"] == receipt_id
+    assert len(exported["products"]) == 2
+
+    csv_response = await client.get("/receipts/export?format=csv", headers=headers)
+    assert csv_response.status_code == 200
+    rows = csv_response.text.splitlines()
+    assert rows[0].startswith("receipt_id,")
+    assert len(rows) == 3
+
+@pytest.mark.asyncio
+async def test_get_receipt_text_is_cached(client, query_counter):
+    """Test that reprinting a receipt is served from the cache."""
+    receipt_id, _ = await test_create_receipt(client)
+
+    first_response = await client.get(f"/receipts/{receipt_id}/text")
+    assert first_response.status_code == 200
+
+    query_counter.clear()
+    second_response = await client.get(f"/receipts/{receipt_id}/text")
+    assert second_response.status_code == 200
+    assert second_response.text == first_response.text
+    assert query_counter == []
+
+    stats_response = await client.get("/internal/caches")
+    assert stats_response.json()["receipt_text"]["hits"] >= 1
+
+@pytest.mark.asyncio
+async def test_get_receipt_texts_batch(client):
+    """Test rendering many receipts as text and as a ZIP archive."""
+    receipt_id, token = await test_create_receipt(client)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    text_response = await client.post(
+        "/receipts/text/batch",
+        json={"receipt_ids": [receipt_id, receipt_id]},
+        headers=headers,
+    )
+    assert text_response.status_code == 200
+    assert text_response.text.count("ФОП Джонсонюк Борис") == 1
+
+    zip_response = await client.post(
+        "/receipts/text/batch",
+        json={"receipt_ids": [receipt_id], "format": "zip"},
+        headers=headers,
+    )
+    assert zip_response.status_code == 200
+    archive = zipfile.ZipFile(io.BytesIO(zip_response.content))
+    assert archive.namelist() == [f"receipt_{receipt_id}.txt"]
+
+    missing_response = await client.post(
+        "/receipts/text/batch", json={"receipt_ids": [9999999]}, headers=headers
+    )
+    assert missing_response.status_code == 404
+
+@pytest.mark.asyncio
+async def test_get_receipt_stats(client):
+    """Test spending stats grouped by period and payment type."""
+    token, _ = await test_register_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    for payment_type, price in (("cash", 10.00), ("cash", 30.00), ("cashless", 50.00)):
+        await client.post(
+            "/receipts/",
+            json={
+                "products": [{"name": "Item", "price": price, "quantity": 1}],
+                "payment": {"type": payment_type, "amount": 100.00},
+            },
+            headers=headers,
+        )
+
+    response = await client.get("/receipts/stats?group_by=month", headers=headers)
+    assert response.status_code == 200
+    stats = {row["payment_type"]: row for row in response.json()}
+    assert stats["cash"]["count"] == 2
+    assert stats["cash"]["total"] == 40.00
+    assert stats["cash"]["average"] == 20.00
+    assert stats["cashless"]["count"] == 1
+
+@pytest.mark.asyncio
+async def test_current_user_is_cached(client, query_counter):
+    """Test that authenticated requests stop querying users once cached."""
+    token, _ = await test_register_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    first_response = await client.get("/receipts/", headers=headers)
+    assert first_response.status_code == 200
+
+    query_counter.clear()
+    second_response = await client.get("/receipts/", headers=headers)
+    assert second_response.status_code == 200
+    assert not any("FROM users" in statement for statement in query_counter)
+
+@pytest.mark.asyncio
+async def test_get_pool_stats(client):
+    """Test the connection pool stats endpoint."""
+    response = await client.get("/internal/pool")
+    assert response.status_code == 200
+    assert {"checked_out", "overflow", "timeouts", "wait_seconds"} <= response.json().keys()
+
+@pytest.mark.asyncio
+async def test_internal_endpoints_require_token(client, monkeypatch):
+    """Test that internal endpoints are closed without the internal token."""
+    response = await client.get("/internal/pool", headers={"X-Internal-Token": "wrong"})
+    assert response.status_code == 403
+    response = await client.get("/metrics", headers={"X-Internal-Token": "wrong"})
+    assert response.status_code == 403
+
+    monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", None)
+    response = await client.get("/internal/pool")
+    assert response.status_code == 403
+
+@pytest.mark.asyncio
+async def test_create_receipt_without_rounding_drift(client):
+    """Test that amounts are computed in kopecks without float drift."""
+    token, _ = await test_register_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = await client.post(
+        "/receipts/",
+        json={
+            "products": [{"name": "Match", "price": 0.10, "quantity": 3}],
+            "payment": {"type": "cash", "amount": 0.30},
+        },
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert response.json()["total"] == 0.30
+    assert response.json()["rest"] == 0.0
+
+    receipt_id = response.json()["id"]
+    text_response = await client.get(f"/receipts/{receipt_id}/text")
+    assert "3 x 0.10" in text_response.text
+
+@pytest.mark.asyncio
+async def test_create_receipt_with_out_of_range_amounts(client):
+    """Test that amounts too large for kopeck columns or below a kopeck are rejected."""
+    token, _ = await test_register_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    for product, amount in [
+        ({"name": "Huge", "price": 1e300, "quantity": 1}, 1e300),
+        ({"name": "Many", "price": 1_000_000, "quantity": 1_000_000}, 1e13),
+        ({"name": "Dust", "price": 0.001, "quantity": 1}, 1.00),
+        ({"name": "Match", "price": 0.10, "quantity": 1}, 0.004),
+    ]:
+        response = await client.post(
+            "/receipts/",
+            json={"products": [product], "payment": {"type": "cash", "amount": amount}},
+            headers=headers,
+        )
+        assert response.status_code == 422
+
+@pytest.mark.asyncio
+async def test_get_metrics(client):
+    """Test that request latency and database work are exported per route."""
+    token, _ = await test_register_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    response = await client.get("/receipts/", headers=headers)
+    assert response.status_code == 200
+
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    metrics = response.text
+    assert 'http_requests_total{method="GET",route="/receipts/",status="200"}' in metrics
+    assert 'http_request_duration_seconds_count{method="POST",route="/token"}' in metrics
+    db_queries = next(
+        line for line in metrics.splitlines()
+        if line.startswith('http_request_db_queries_sum{method="GET",route="/receipts/"}')
+    )
+    assert float(db_queries.split()[-1]) > 0
+
+@pytest.mark.asyncio
+async def test_profile_request(client):
+    """Test that a request sent with the X-Profile header is profiled."""
+    token, _ = await test_register_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = await client.get("/receipts/", headers=headers)
+    assert "X-Profile-Id" not in response.headers
+
+    async with AsyncClient(
+        transport=ASGITransport(app=ProfilingMiddleware(app, interval=0.001)),
+        base_url="http://test",
+    ) as profiled_client:
+        response = await profiled_client.get(
+            "/receipts/?limit=100", headers={**headers, "X-Profile": "wrong-token"}
+        )
+        assert "X-Profile-Id" not in response.headers
+        response = await profiled_client.get(
+            "/receipts/?limit=100",
+            headers={**headers, "X-Profile": settings.INTERNAL_API_TOKEN},
+        )
+    assert response.status_code == 200
+    profile_id = response.headers["X-Profile-Id"]
+
+    response = await client.get(f"/internal/profiles/{profile_id}")
+    assert response.status_code == 200
+    profile = response.json()
+    assert profile["path"] == "/receipts/"
+    assert profile["query"] == "limit=100"
+    assert profile["stacks_scope"] == "process"
+    assert any("FROM receipts" in s["statement"] for s in profile["statements"])
+
+    response = await client.get(f"/internal/profiles/{profile_id}/folded")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert response.headers["X-Stacks-Scope"] == "process"
+
+@pytest.mark.asyncio
+async def test_search_receipts(client):
+    """Test searching receipts by product name."""
+    token, _ = await test_register_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    ids = []
+    for products, payment_type in [
+        (["Молоко 2.5%", "Хліб"], "cash"),
+        (["Кефір"], "cash"),
+        (["Сир", "Молоко козяче"], "cashless"),
+    ]:
+        response = await client.post(
+            "/receipts/",
+            json={
+                "products": [
+                    {"name": name, "price": 10.00, "quantity": 1} for name in products
+                ],
+                "payment": {"type": payment_type, "amount": 50.00},
+            },
+            headers=headers,
+        )
+        ids.append(response.json()["id"])
+
+    async def search(**params):
+        response = await client.get("/receipts/search", params=params, headers=headers)
+        assert response.status_code == 200
+        return [receipt["id"] for receipt in response.json()]
+
+    assert await search(q="молоко") == [ids[2], ids[0]]
+    assert await search(q="коз", mode="prefix") == [ids[2]]
+    assert await search(q="олоко", mode="prefix") == []
+    assert await search(q="молокко") == []
+    assert await search(q="молокко", mode="fuzzy") == [ids[2], ids[0]]
+    assert await search(q="молоко", payment_type="cash") == [ids[0]]
+
+    response = await client.get(
+        "/receipts/search", params={"q": "молоко", "limit": 1}, headers=headers
+    )
+    assert [receipt["id"] for receipt in response.json()] == [ids[2]]
+    assert await search(
+        q="молоко", limit=1, cursor=response.headers["X-Next-Cursor"]
+    ) == [ids[0]]
+
+@pytest.fixture
+def eager_jobs(monkeypatch, tmp_path):
+    """Runs submitted jobs inline, in sessions of the test database."""
+    monkeypatch.setattr(database, "_async_session", TestingSessionLocal)
+    monkeypatch.setattr(broker, "eager", True)
+    monkeypatch.setattr(settings, "JOB_RESULT_DIR", str(tmp_path))
+
+
+@pytest.mark.asyncio
+async def test_export_job(client, eager_jobs):
+    """Test exporting receipts in a background job."""
+    receipt_id, token = await test_create_receipt(client)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = await client.post(
+        "/jobs/", json={"kind": "export", "params": {"format": "csv"}}, headers=headers
+    )
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+
+    response = await client.get(f"/jobs/{job_id}", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["status"] == "succeeded"
+
+    response = await client.get(f"/jobs/{job_id}/result", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = response.text.splitlines()
+    assert rows[0].startswith("receipt_id,")
+    assert all(row.startswith(f"{receipt_id},") for row in rows[1:])
+
+
+@pytest.mark.asyncio
+async def test_export_job_over_result_size_limit(client, eager_jobs, monkeypatch, tmp_path):
+    """Test that an export larger than JOB_RESULT_MAX_BYTES fails and leaves no file."""
+    _, token = await test_create_receipt(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    monkeypatch.setattr(settings, "JOB_RESULT_MAX_BYTES", 10)
+
+    response = await client.post(
+        "/jobs/", json={"kind": "export", "params": {"format": "csv"}}, headers=headers
+    )
+    job = (await client.get(f"/jobs/{response.json()['id']}", headers=headers)).json()
+    assert job["status"] == "failed"
+    assert "larger than 10 bytes" in job["error"]
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_reprint_job(client, eager_jobs):
+    """Test reprinting receipts as a ZIP in a background job."""
+    receipt_id, token = await test_create_receipt(client)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = await client.post(
+        "/jobs/",
+        json={"kind": "reprint", "params": {"receipt_ids": [receipt_id], "format": "zip"}},
+        headers=headers,
+    )
+    job_id = response.json()["id"]
+
+    response = await client.get(f"/jobs/{job_id}/result", headers=headers)
+    assert response.status_code == 200
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    assert archive.namelist() == [f"receipt_{receipt_id}.txt"]
+
+
+@pytest.mark.asyncio
+async def test_failed_and_foreign_jobs(client, eager_jobs):
+    """Test the status of a failed job and access to another user's job."""
+    token, _ = await test_register_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = await client.post(
+        "/jobs/", json={"kind": "reprint", "params": {}}, headers=headers
+    )
+    assert response.status_code == 422
+
+    response = await client.post(
+        "/jobs/", json={"kind": "reprint", "params": {"receipt_ids": [999]}}, headers=headers
+    )
+    job_id = response.json()["id"]
+
+    response = await client.get(f"/jobs/{job_id}", headers=headers)
+    assert response.json()["status"] == "failed"
+    assert "Receipt not found" in response.json()["error"]
+
+    response = await client.get(f"/jobs/{job_id}/result", headers=headers)
+    assert response.status_code == 409
+
+    other_token, _ = await test_register_and_login(client)
+    response = await client.get(
+        f"/jobs/{job_id}", headers={"Authorization": f"Bearer {other_token}"}
+    )
+    assert response.status_code == 403
+
+@pytest.mark.asyncio
+async def test_lost_running_job_is_run_again(client, eager_jobs):
+    """Test that a running job is claimed again only after the visibility timeout."""
+    receipt_id, token = await test_create_receipt(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    response = await client.post(
+        "/jobs/",
+        json={"kind": "reprint", "params": {"receipt_ids": [receipt_id]}},
+        headers=headers,
+    )
+    job_id = response.json()["id"]
+
+    async with TestingSessionLocal() as db:
+        for started_at, status in [
+            (datetime.utcnow(), "running"),
+            (
+                datetime.utcnow() - timedelta(seconds=settings.JOB_VISIBILITY_TIMEOUT + 1),
+                "succeeded",
+            ),
+        ]:
+            await db.execute(
+                update(JobModel)
+                .where(JobModel.id == job_id)
+                .values(status=JobStatus.RUNNING, started_at=started_at, result=None)
+            )
+            await db.commit()
+            assert (job_id in await JobService(db).get_runnable_ids()) == (
+                status == "succeeded"
+            )
+            await JobService(db).run(job_id)
+
+            response = await client.get(f"/jobs/{job_id}", headers=headers)
+            assert response.json()["status"] == status
+
+@pytest.mark.asyncio
+async def test_create_receipt_with_idempotency_key(client):
+    """Test that retries with an Idempotency-Key replay the first receipt."""
+    token, _ = await test_register_and_login(client)
+    headers = {"Authorization": f"Bearer {token}", "Idempotency-Key": "retry-1"}
+    receipt = {
+        "products": [{"name": "Bread", "price": 30.00, "quantity": 1}],
+        "payment": {"type": "cash", "amount": 50.00},
+    }
+    # Authenticate once, so the concurrent requests below share no database work.
+    await client.get("/receipts/", headers=headers)
+
+    responses = await asyncio.gather(
+        *(client.post("/receipts/", json=receipt, headers=headers) for _ in range(3))
+    )
+    assert {response.status_code for response in responses} == {200}
+    assert len({response.json()["id"] for response in responses}) == 1
+    assert sum("Idempotent-Replayed" in response.headers for response in responses) == 2
+
+    response = await client.post("/receipts/", json=receipt, headers=headers)
+    assert response.json() == responses[0].json()
+    assert response.headers["Idempotent-Replayed"] == "true"
+
+    response = await client.post(
+        "/receipts/",
+        json={**receipt, "payment": {"type": "cash", "amount": 100.00}},
+        headers=headers,
+    )
+    assert response.status_code == 422
+
+    response = await client.get("/receipts/", headers=headers)
+    assert len(response.json()) == 1
+
+@pytest.mark.asyncio
+async def test_conditional_get_receipt(client, query_counter):
+    """Test that receipts carry ETags and matching conditional requests get a 304."""
+    receipt_id, token = await test_create_receipt(client)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    for url, request_headers in (
+        (f"/receipts/{receipt_id}", headers),
+        (f"/receipts/{receipt_id}/text", {}),
+    ):
+        response = await client.get(url, headers=request_headers)
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+        assert not etag.startswith("W/")
+        assert "immutable" in response.headers["cache-control"]
+
+        query_counter.clear()
+        response = await client.get(url, headers={**request_headers, "If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+        assert not any("receipts" in statement for statement in query_counter)
+
+    response = await client.get(f"/receipts/{receipt_id}/text?line_length=60")
+    assert response.headers["etag"] != etag
+
+    response = await client.get(
+        f"/receipts/{receipt_id}", headers={**headers, "If-None-Match": "*"}
+    )
+    assert response.status_code == 304
+    response = await client.get(
+        f"/receipts/{receipt_id + 1}/text", headers={"If-None-Match": "*"}
+    )
+    assert response.status_code == 404
+
+    response = await client.get("/receipts/", headers=headers)
+    list_etag = response.headers["etag"]
+    assert list_etag.startswith("W/")
+    query_counter.clear()
+    response = await client.get("/receipts/", headers={**headers, "If-None-Match": list_etag})
+    assert response.status_code == 304
+    assert not any("receipt_items" in statement for statement in query_counter)
+
+    response = await client.post(
+        "/receipts/",
+        json={
+            "products": [{"name": "Bread", "price": 30.00, "quantity": 1}],
+            "payment": {"type": "cash", "amount": 30.00},
+        },
+        headers=headers,
+    )
+    assert response.status_code == 200
+    response = await client.get("/receipts/", headers={**headers, "If-None-Match": list_etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != list_etag
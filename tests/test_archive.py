@@ -0,0 +1,134 @@
+import pytest
+from datetime import datetime
+from app import archive
+from app.archive import ArchiveReader, ArchiveWriter, archive_receipts
+from app.enums.receipt_payment import PaymentType
+from app.models.receipt import Receipt as ReceiptModel
+from app.models.receipt_item import ReceiptItem
+from app.partitions import month_start
+from app.services.receipt_service import receipt_text_cache
+from tests.conftest import TestingSessionLocal
+
+
+def make_receipt(receipt_id: int) -> ReceiptModel:
+    return ReceiptModel(
+        id=receipt_id,
+        total=100 * receipt_id,
+        rest=0,
+        payment_type=PaymentType.CASHLESS,
+        payment_amount=100 * receipt_id,
+        created_at=datetime(2023, 5, 1, 12, 30, 15, 123456),
+        owner_id=7,
+        items=[
+            ReceiptItem(name=f"Товар {number}", price=100, quantity=number, total=100 * number)
+            for number in range(receipt_id % 3)
+        ],
+    )
+
+
+@pytest.mark.asyncio
+async def test_archive_file_round_trip(tmp_path):
+    """Test that every receipt written to an archive file is read back by id."""
+    writer = ArchiveWriter(str(tmp_path / "receipts-2023-05.arc"))
+    ids = list(range(1, 1000, 2))
+    for start in range(0, len(ids), archive.BLOCK_SIZE):
+        writer.add_block(
+            [make_receipt(receipt_id) for receipt_id in ids[start : start + archive.BLOCK_SIZE]]
+        )
+    writer.close()
+    archive.write_manifest(
+        str(tmp_path),
+        {
+            "2023-05": {
+                "file": "receipts-2023-05.arc",
+                "min_id": writer.min_id,
+                "max_id": writer.max_id,
+            }
+        },
+    )
+
+    reader = ArchiveReader(str(tmp_path))
+    for receipt_id in ids:
+        receipt = reader.get(receipt_id)
+        expected = make_receipt(receipt_id)
+        assert (receipt.id, receipt.total, receipt.payment_type, receipt.created_at) == (
+            expected.id,
+            expected.total,
+            expected.payment_type,
+            expected.created_at,
+        )
+        assert [(item.name, item.quantity) for item in receipt.items] == [
+            (item.name, item.quantity) for item in expected.items
+        ]
+    assert reader.get(2) is None
+    assert reader.get(1001) is None
+
+
+def make_old_receipt(owner_id: int) -> ReceiptModel:
+    return ReceiptModel(
+        total=9100,
+        rest=900,
+        payment_type=PaymentType.CASH,
+        payment_amount=10000,
+        created_at=datetime(2023, 5, 1, 12, 30, 15, 123456),
+        owner_id=owner_id,
+        items=[ReceiptItem(name="Кава", price=4550, quantity=2, total=9100)],
+    )
+
+
+@pytest.mark.asyncio
+async def test_archived_receipt_is_still_served(client, tmp_path, monkeypatch):
+    """Test that archived receipts are deleted from the database and read from their file."""
+    response = await client.post(
+        "/users/",
+        json={"username": "archived", "email": "archived@example.com", "password": "password"},
+    )
+    owner_id = response.json()["id"]
+    response = await client.post(
+        "/token", data={"username": "archived", "password": "password"}
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    async with TestingSessionLocal() as db:
+        old_receipt = make_old_receipt(owner_id)
+        db.add(old_receipt)
+        await db.commit()
+    receipt_id = old_receipt.id
+    receipt = (await client.get(f"/receipts/{receipt_id}", headers=headers)).json()
+    text = (await client.get(f"/receipts/{receipt_id}/text")).text
+    current_receipt = (
+        await client.post(
+            "/receipts/",
+            json={
+                "products": [{"name": "Кава", "price": 45.50, "quantity": 2}],
+                "payment": {"type": "cash", "amount": 100.00},
+            },
+            headers=headers,
+        )
+    ).json()
+
+    monkeypatch.setattr(archive.archive_reader, "directory", str(tmp_path))
+    this_month = month_start(datetime.utcnow().date())
+    with pytest.raises(ValueError):
+        await archive_receipts(TestingSessionLocal, month_start(this_month, 1), str(tmp_path))
+    archived = await archive_receipts(TestingSessionLocal, this_month, str(tmp_path))
+    assert {key: entry["receipts"] for key, entry in archived.items()} == {"2023-05": 1}
+    await receipt_text_cache.clear()
+
+    response = await client.get("/receipts/", headers=headers)
+    assert [receipt["id"] for receipt in response.json()] == [current_receipt["id"]]
+    response = await client.get(f"/receipts/{receipt_id}", headers=headers)
+    assert response.status_code == 200
+    assert response.json() == receipt
+    response = await client.get(f"/receipts/{receipt_id}/text")
+    assert response.text == text
+    response = await client.get(f"/receipts/{current_receipt['id'] + 1}", headers=headers)
+    assert response.status_code == 404
+
+    # A receipt of an archived month that is not in its file is not deleted.
+    async with TestingSessionLocal() as db:
+        late_receipt = make_old_receipt(owner_id)
+        db.add(late_receipt)
+        await db.commit()
+    assert await archive_receipts(TestingSessionLocal, this_month, str(tmp_path)) == {}
+    async with TestingSessionLocal() as db:
+        assert await db.get(ReceiptModel, (late_receipt.id, late_receipt.created_at))
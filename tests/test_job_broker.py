@@ -0,0 +1,51 @@
+import asyncio
+import pytest
+from app.jobs import broker as broker_module
+from app.jobs.broker import InProcessBroker
+
+
+@pytest.mark.asyncio
+async def test_in_process_broker_bounds_concurrency(monkeypatch):
+    """Test that no more than `concurrency` jobs run at once."""
+    running = 0
+    peak = 0
+    finished = []
+
+    async def run_job(job_id):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        finished.append(job_id)
+
+    monkeypatch.setattr(broker_module, "run_job", run_job)
+    broker = InProcessBroker(concurrency=2)
+
+    for job_id in range(6):
+        await broker.submit(str(job_id))
+    assert broker.stats()["queued"] + broker.stats()["running"] == 6
+
+    await broker.join()
+    assert peak == 2
+    assert sorted(finished) == [str(job_id) for job_id in range(6)]
+
+
+@pytest.mark.asyncio
+async def test_in_process_broker_resubmits_runnable_jobs(monkeypatch):
+    """Test that the pending and lost jobs are run again on startup."""
+    finished = []
+
+    async def get_runnable_job_ids():
+        return ["pending", "lost"]
+
+    async def run_job(job_id):
+        finished.append(job_id)
+
+    monkeypatch.setattr(broker_module, "get_runnable_job_ids", get_runnable_job_ids)
+    monkeypatch.setattr(broker_module, "run_job", run_job)
+    broker = InProcessBroker(concurrency=2)
+
+    assert await broker.resubmit() == 2
+    await broker.join()
+    assert finished == ["pending", "lost"]
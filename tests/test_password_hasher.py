@@ -0,0 +1,54 @@
+import asyncio
+import time
+import pytest
+from fastapi import HTTPException
+from app.utils import PasswordHasher, get_password_hash
+
+
+async def max_event_loop_lag(coroutine, interval: float = 0.005) -> float:
+    """Run a coroutine and return the worst event loop delay seen meanwhile."""
+    lags = []
+
+    async def ticker():
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            lags.append(time.perf_counter() - started - interval)
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    await coroutine
+    task.cancel()
+    return max(lags)
+
+
+@pytest.mark.asyncio
+async def test_login_storm_does_not_block_event_loop():
+    """Test that concurrent bcrypt verifications leave the event loop responsive."""
+    password_hasher = PasswordHasher(workers=4, max_pending=64)
+    hashed_password = get_password_hash("secret")
+
+    lag = await max_event_loop_lag(
+        asyncio.gather(
+            *(password_hasher.verify("secret", hashed_password) for _ in range(16))
+        )
+    )
+
+    assert lag < 0.05
+    assert password_hasher.stats()["completed"] == 16
+
+
+@pytest.mark.asyncio
+async def test_password_hasher_rejects_when_full():
+    """Test that calls beyond the pending limit are rejected with 503."""
+    password_hasher = PasswordHasher(workers=1, max_pending=1)
+
+    results = await asyncio.gather(
+        password_hasher.hash("first"),
+        password_hasher.hash("second"),
+        return_exceptions=True,
+    )
+
+    assert isinstance(results[1], HTTPException)
+    assert results[1].status_code == 503
+    assert password_hasher.stats()["rejected"] == 1
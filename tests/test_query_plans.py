@@ -0,0 +1,115 @@
+import pytest
+from datetime import date, datetime
+from sqlalchemy import text, tuple_
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.future import select
+from app.enums.receipt_payment import PaymentType
+from app.enums.search_mode import SearchMode
+from app.enums.sort_order import SortOrder
+from app.models.receipt_item import ReceiptItem
+from app.partitions import ensure_partitions
+from app.services.receipt_service import ReceiptService
+from tests.conftest import engine
+
+# Plans name the indexes of the partitions, which PostgreSQL names after the
+# partition and the indexed columns, e.g. receipts_default_owner_id_total_idx
+# for ix_receipts_owner_id_total.
+
+
+async def explain(db, query) -> str:
+    """Return the query plan of a SQLAlchemy query with sequential scans disabled."""
+    sql = query.compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    )
+    await db.execute(text("SET LOCAL enable_seqscan = off"))
+    result = await db.execute(text(f"EXPLAIN {sql}"))
+    return "\n".join(result.scalars().all())
+
+
+@pytest.mark.asyncio
+async def test_owner_page_uses_index(db):
+    """Test that a page of a user's receipts is read through the owner index."""
+    query = ReceiptService._order_by_position(
+        ReceiptService._filter_by_owner(1), SortOrder.DESC
+    ).limit(10)
+
+    plan = await explain(db, query)
+    assert "_owner_id_created_at_id_idx" in plan
+
+
+@pytest.mark.asyncio
+async def test_payment_type_filter_uses_index(db):
+    """Test that filtering by payment type is served by the payment type index."""
+    query = ReceiptService._order_by_position(
+        ReceiptService._filter_by_owner(1, payment_type=PaymentType.CASH),
+        SortOrder.DESC,
+    ).limit(10)
+
+    plan = await explain(db, query)
+    assert "_owner_id_payment_type_created_at_id_idx" in plan
+    assert "_owner_id_created_at_id_idx" not in plan
+    assert "Seq Scan" not in plan
+
+
+@pytest.mark.asyncio
+async def test_total_filter_uses_index(db):
+    """Test that filtering by total is served by the total index."""
+    query = ReceiptService._filter_by_owner(1, min_total=10, max_total=100)
+
+    plan = await explain(db, query)
+    assert "_owner_id_total_idx" in plan
+    assert "Seq Scan" not in plan
+
+
+@pytest.mark.asyncio
+async def test_items_lookup_uses_index(db):
+    """Test that loading the items of a page uses the receipt_id index."""
+    query = select(ReceiptItem).filter(ReceiptItem.receipt_id.in_([1, 2, 3]))
+
+    plan = await explain(db, query)
+    assert "_receipt_id_idx" in plan
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", [SearchMode.PREFIX, SearchMode.CONTAINS])
+async def test_name_search_uses_trigram_index(db, mode):
+    """Test that product-name search is served by the trigram index."""
+    query = select(ReceiptItem.receipt_id).filter(
+        ReceiptService._name_matches("молоко", mode)
+    )
+
+    plan = await explain(db, query)
+    assert "_name_idx" in plan
+
+
+@pytest.mark.asyncio
+async def test_date_range_prunes_partitions(db):
+    """Test that a date range only reads the partitions of its months."""
+    # A partition overlapping March fails on its own, without the later ones.
+    async with engine.begin() as conn:
+        await conn.execute(
+            text(
+                "CREATE TABLE receipts_march PARTITION OF receipts "
+                "FOR VALUES FROM ('2024-03-01') TO ('2024-04-01')"
+            )
+        )
+    result = await ensure_partitions(engine, months_ahead=2, today=date(2024, 1, 15))
+    assert [failure["partition"] for failure in result["failed"]] == ["receipts_y2024m03"]
+    assert "receipt_items_y2024m03" in result["created"]
+
+    query = ReceiptService._filter_by_owner(
+        1, start_date=datetime(2024, 2, 1), end_date=datetime(2024, 2, 20)
+    )
+    plan = await explain(db, query)
+    assert "receipts_y2024m02" in plan
+    assert "receipts_y2024m01" not in plan
+    assert "receipts_march" not in plan
+
+    query = select(ReceiptItem).filter(
+        tuple_(ReceiptItem.receipt_id, ReceiptItem.receipt_created_at).in_(
+            [(1, datetime(2024, 2, 3)), (2, datetime(2024, 2, 4))]
+        )
+    )
+    plan = await explain(db, query)
+    assert "receipt_items_y2024m02" in plan
+    assert "receipt_items_y2024m01" not in plan
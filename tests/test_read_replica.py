@@ -0,0 +1,121 @@
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlalchemy.sql import text
+from app import database
+from app.config import settings
+from app.database import Base
+from app.main import app
+from tests.conftest import TestingSessionLocal, admin_engine, engine
+
+REPLICA_URL = (
+    str(settings.TEST_SQLALCHEMY_DATABASE_URL).rsplit("/", 1)[0] + "/test_replica_db"
+)
+
+
+@pytest_asyncio.fixture
+async def replica_client(monkeypatch):
+    """
+    Provides a client writing to the test database and reading from an
+    empty replica database, without dependency overrides.
+    """
+    with admin_engine.connect() as conn:
+        try:
+            conn.execute(text("CREATE DATABASE test_replica_db"))
+        except Exception as e:
+            print(f"Database test_replica_db already exists, continuing... ({e})")
+
+    replica_engine = create_async_engine(REPLICA_URL, poolclass=NullPool)
+    async with replica_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    monkeypatch.setattr(settings, "DB_REPLICA_URL", REPLICA_URL)
+    monkeypatch.setattr(database, "_engine", engine)
+    monkeypatch.setattr(database, "_replica_engine", replica_engine)
+    monkeypatch.setattr(database, "_async_session", TestingSessionLocal)
+    monkeypatch.setattr(database, "_read_session", None)
+    monkeypatch.setattr(database, "_primary_read_session", None)
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as c:
+        yield c
+    await replica_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_replica_except_after_write(replica_client):
+    """Test that a client reads its own writes, and otherwise reads the replica."""
+    await replica_client.post(
+        "/users/",
+        json={"username": "reader", "email": "reader@example.com", "password": "password"},
+    )
+    response = await replica_client.post(
+        "/token", data={"username": "reader", "password": "password"}
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    response = await replica_client.post(
+        "/receipts/",
+        json={
+            "products": [{"name": "Coffee", "price": 50.00, "quantity": 1}],
+            "payment": {"type": "cash", "amount": 50.00},
+        },
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert replica_client.cookies.get(database.READ_PRIMARY_COOKIE)
+
+    response = await replica_client.get(f"/receipts/{response.json()['id']}", headers=headers)
+    assert response.status_code == 200
+
+    replica_client.cookies.clear()
+    response = await replica_client.get("/receipts/", headers=headers)
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+@pytest.mark.asyncio
+async def test_idempotent_create_reads_from_primary(replica_client):
+    """Test that creates sent with an Idempotency-Key also send reads to the primary."""
+    await replica_client.post(
+        "/users/",
+        json={"username": "retrier", "email": "retrier@example.com", "password": "password"},
+        headers={"Idempotency-Key": "register-1"},
+    )
+    assert replica_client.cookies.get(database.READ_PRIMARY_COOKIE)
+    response = await replica_client.post(
+        "/token", data={"username": "retrier", "password": "password"}
+    )
+    headers = {
+        "Authorization": f"Bearer {response.json()['access_token']}",
+        "Idempotency-Key": "receipt-1",
+    }
+
+    for replayed in (False, True):
+        replica_client.cookies.clear()
+        response = await replica_client.post(
+            "/receipts/",
+            json={
+                "products": [{"name": "Coffee", "price": 50.00, "quantity": 1}],
+                "payment": {"type": "cash", "amount": 50.00},
+            },
+            headers=headers,
+        )
+        assert response.status_code == 200
+        assert ("Idempotent-Replayed" in response.headers) == replayed
+        assert replica_client.cookies.get(database.READ_PRIMARY_COOKIE)
+
+    response = await replica_client.get(f"/receipts/{response.json()['id']}", headers=headers)
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_read_sessions_are_read_only():
+    """Test that read sessions run read-only transactions."""
+    session_factory = database._read_only_sessionmaker(engine)
+    async with session_factory() as session:
+        with pytest.raises(DBAPIError, match="read-only transaction"):
+            await session.execute(text("DELETE FROM receipts"))